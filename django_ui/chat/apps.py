@@ -1,6 +1,32 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
+
+
+def _serves_requests() -> bool:
+    """Whether this process will handle requests (and so needs the GraphRAG data)."""
+    if 'runserver' in sys.argv:
+        # The autoreloader's parent process only watches files; the child has RUN_MAIN set
+        return '--noreload' in sys.argv or os.environ.get('RUN_MAIN') == 'true'
+    
+    # Anything else (gunicorn, tests, shells, workers, other management commands)
+    # only preloads when explicitly asked to, e.g. by gunicorn.conf.py
+    return settings.GRAPHRAG_CONFIG.get('PRELOAD', False)
 
 
 class ChatConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "chat"
+
+    def ready(self):
+        if not _serves_requests():
+            return
+        
+        # Load GraphRAG data once at boot so no request pays the cold-start cost
+        from .services import graphrag_service, search_batcher
+        graphrag_service.load_data()
+        
+        # Start the shared search queue before any request is served
+        search_batcher.start()
@@ -5,16 +5,143 @@ This module handles all GraphRAG API interactions for the Django chat applicatio
 
 import logging
 import asyncio
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import pandas as pd
+import pyarrow.parquet as pq
 from pathlib import Path
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional, AsyncIterator, Iterator
 from django.conf import settings
 from graphrag.config.load_config import load_config
 import graphrag.api as api
+from graphrag_common.indexer_cache import install_adapter_cache
+from graphrag_common.tables import PARQUET_TABLES, REQUIRED_COLS, LOW_CARD_COLS
 
 # Set up logging
 logger = logging.getLogger('chat')
 
+# Search settings snapshotted from settings.GRAPHRAG_CONFIG so hot paths avoid
+# LazySettings attribute and dict lookups on every call
+SEARCH_TIMEOUT = None
+COMMUNITY_LEVEL = None
+RESPONSE_TYPE = None
+DEFAULT_MODEL = None
+CONTEXT_MAX = None
+
+def reload_config() -> None:
+    """(Re)read the search settings from settings.GRAPHRAG_CONFIG."""
+    global SEARCH_TIMEOUT, COMMUNITY_LEVEL, RESPONSE_TYPE, DEFAULT_MODEL, CONTEXT_MAX
+    config = settings.GRAPHRAG_CONFIG
+    SEARCH_TIMEOUT = config['SEARCH_TIMEOUT']
+    COMMUNITY_LEVEL = config['COMMUNITY_LEVEL']
+    RESPONSE_TYPE = config['RESPONSE_TYPE']
+    DEFAULT_MODEL = config['DEFAULT_MODEL']
+    CONTEXT_MAX = config.get('CONTEXT_MAX', 1000)
+
+reload_config()
+
+# Important terms to highlight in responses (customise based on your domain)
+IMPORTANT_TERMS = [
+    'Cost Rental', 'Housing Agency', 'Local Authority',
+    'Dublin', 'Ireland', 'Government', 'Citizen'
+]
+
+# Patterns used by format_response, compiled once at import
+_BULLET_RE = re.compile(r'^[•·\-\*]\s+', re.MULTILINE)
+_BLANKS_RE = re.compile(r'\n\n+')
+_TERMS_RE = re.compile(
+    r'\b(' + '|'.join(map(re.escape, IMPORTANT_TERMS)) + r')\b', re.IGNORECASE
+)
+_TERMS_CANONICAL = {term.lower(): term for term in IMPORTANT_TERMS}
+
+# Persistent event loop shared by all requests, so async HTTP clients inside
+# graphrag can keep connections alive between queries
+_LOOP = None
+
+def _start_loop() -> None:
+    global _LOOP
+    _LOOP = asyncio.new_event_loop()
+    threading.Thread(target=_LOOP.run_forever, name='graphrag-loop', daemon=True).start()
+
+_start_loop()
+
+def run_async(coro, timeout: Optional[float] = None):
+    """Run a coroutine on the shared event loop and block until it completes."""
+    return asyncio.run_coroutine_threadsafe(coro, _LOOP).result(timeout)
+
+def iter_async(agen: AsyncIterator, timeout: Optional[float] = None) -> Iterator:
+    """
+    Iterate an async generator on the shared event loop from synchronous code.
+    `timeout` bounds the wait for each item, not the whole iteration.
+    """
+    try:
+        while True:
+            try:
+                # wait_for cancels the pending step on the loop itself, so aclose() is safe
+                yield run_async(asyncio.wait_for(agen.__anext__(), timeout))
+            except StopAsyncIteration:
+                return
+    finally:
+        run_async(agen.aclose())
+
+def _read_parquet(path: str, columns: Optional[list] = None,
+                  categories: Optional[list] = None) -> pd.DataFrame:
+    """
+    Read a parquet file through a memory map so pages are faulted in on demand.
+    Only `columns` that exist in the file are decoded (all columns if None),
+    Arrow buffers are released as columns are converted to keep peak memory low,
+    and any `categories` columns are built directly as pandas categoricals.
+    """
+    if columns is not None:
+        available = set(pq.read_schema(path).names)
+        columns = [col for col in columns if col in available]
+    
+    table = pq.read_table(path, columns=columns, memory_map=True, pre_buffer=True)
+    categories = [col for col in categories or [] if col in table.column_names]
+    return table.to_pandas(categories=categories, self_destruct=True, split_blocks=True)
+
+def _truncate(text: str, max_chars: int) -> str:
+    """Cut text to max_chars, marking it as truncated."""
+    if len(text) > max_chars:
+        return f"{text[:max_chars]}... (truncated)"
+    return text
+
+def _cheap_context_repr(context: Any, max_chars: int = 1000) -> str:
+    """
+    Build a bounded text preview of search context without stringifying all of it.
+    DataFrames are rendered from their first rows only and dict/list sections
+    share the character budget.
+    """
+    if context is None:
+        return ""
+    
+    if isinstance(context, pd.DataFrame):
+        if context.empty:
+            return ""
+        return _truncate(context.head(20).to_string(max_cols=6), max_chars)
+    
+    if isinstance(context, (dict, list, tuple)):
+        items = context.items() if isinstance(context, dict) else enumerate(context)
+        sections = [
+            (name, value) for name, value in items
+            if not (isinstance(value, pd.DataFrame) and value.empty)
+        ]
+        if not sections:
+            return ""
+        
+        budget = max(max_chars // len(sections), 1)
+        # Section headers, separators and per-section markers come on top of the
+        # budget, so cut the joined text to max_chars as well
+        return _truncate("\n---\n".join(
+            f"{name}:\n{_cheap_context_repr(value, budget)}" for name, value in sections
+        ), max_chars)
+    
+    return _truncate(str(context), max_chars)
+
 class GraphRAGService:
     """
     Service class to handle GraphRAG operations.
@@ -40,19 +167,27 @@ class GraphRAGService:
             
             # Override model configuration with our fixed model
             if hasattr(self._config, 'llm_config'):
-                self._config.llm_config.model = settings.GRAPHRAG_CONFIG['DEFAULT_MODEL']
+                self._config.llm_config.model = DEFAULT_MODEL
             
-            # Load all required parquet files
+            # Load all required parquet files in parallel (pyarrow releases the GIL)
             output_path = settings.GRAPHRAG_OUTPUT_PATH
+            files = {name: f"{output_path}/{name}.parquet" for name in PARQUET_TABLES}
+            
+            with ThreadPoolExecutor(max_workers=len(files)) as executor:
+                futures = {
+                    name: executor.submit(
+                        _read_parquet, path, REQUIRED_COLS.get(name), LOW_CARD_COLS.get(name)
+                    )
+                    for name, path in files.items()
+                }
+                data = {name: future.result() for name, future in futures.items()}
+            
+            data["config"] = self._config
+            self._data = data
             
-            self._data = {
-                "entities": pd.read_parquet(f"{output_path}/entities.parquet"),
-                "communities": pd.read_parquet(f"{output_path}/communities.parquet"),
-                "community_reports": pd.read_parquet(f"{output_path}/community_reports.parquet"),
-                "text_units": pd.read_parquet(f"{output_path}/text_units.parquet"),
-                "relationships": pd.read_parquet(f"{output_path}/relationships.parquet"),
-                "config": self._config
-            }
+            # The same frames are passed on every search, so convert them to
+            # graphrag's data model once rather than per query
+            install_adapter_cache()
             
             logger.info(f"GraphRAG data loaded successfully:")
             logger.info(f"  - Entities: {len(self._data['entities'])} records")
@@ -76,22 +211,19 @@ class GraphRAGService:
         Returns (response, context) tuple.
         """
         try:
-            logger.info(f"Starting search with timeout: {settings.GRAPHRAG_CONFIG['SEARCH_TIMEOUT']}s")
+            logger.info(f"Starting search with timeout: {SEARCH_TIMEOUT}s")
             
-            # Create search task
-            search_task = asyncio.create_task(search_func(**kwargs))
-            
-            # Wait for completion with timeout
+            # wait_for schedules the coroutine itself and cancels it on timeout
             response, context = await asyncio.wait_for(
-                search_task, 
-                timeout=settings.GRAPHRAG_CONFIG['SEARCH_TIMEOUT']
+                search_func(**kwargs),
+                timeout=SEARCH_TIMEOUT
             )
             
             logger.info("Search completed successfully")
-            return response, str(context)
+            return response, _cheap_context_repr(context, max_chars=CONTEXT_MAX)
             
         except asyncio.TimeoutError:
-            error_msg = f"Search timed out after {settings.GRAPHRAG_CONFIG['SEARCH_TIMEOUT']} seconds"
+            error_msg = f"Search timed out after {SEARCH_TIMEOUT} seconds"
             logger.error(error_msg)
             return error_msg, ""
             
@@ -100,6 +232,42 @@ class GraphRAGService:
             logger.error(error_msg, exc_info=True)
             return error_msg, ""
     
+    def _search_params(self, query: str, search_type: str) -> Dict[str, Any]:
+        """Build the graphrag.api keyword arguments for a search type."""
+        search_params = {
+            "config": self._data["config"],
+            "query": query
+        }
+        
+        if search_type == 'global':
+            search_params.update({
+                "entities": self._data["entities"],
+                "communities": self._data["communities"],
+                "community_reports": self._data["community_reports"],
+                "community_level": COMMUNITY_LEVEL,
+                "dynamic_community_selection": False,
+                "response_type": RESPONSE_TYPE
+            })
+        elif search_type == 'local':
+            search_params.update({
+                "entities": self._data["entities"],
+                "communities": self._data["communities"],
+                "community_reports": self._data["community_reports"],
+                "text_units": self._data["text_units"],
+                "relationships": self._data["relationships"],
+                "covariates": None,
+                "community_level": COMMUNITY_LEVEL,
+                "response_type": RESPONSE_TYPE
+            })
+        elif search_type == 'basic':
+            search_params.update({
+                "text_units": self._data["text_units"]
+            })
+        else:
+            raise ValueError(f"Unknown search type: {search_type}")
+        
+        return search_params
+    
     async def global_search(self, query: str) -> Tuple[str, str]:
         """
         Perform Global Search - analyzes entire knowledge base for broad insights.
@@ -110,17 +278,7 @@ class GraphRAGService:
         
         logger.info(f"Performing Global Search for: {query}")
         
-        search_params = {
-            "config": self._data["config"],
-            "query": query,
-            "entities": self._data["entities"],
-            "communities": self._data["communities"],
-            "community_reports": self._data["community_reports"],
-            "community_level": settings.GRAPHRAG_CONFIG['COMMUNITY_LEVEL'],
-            "dynamic_community_selection": False,
-            "response_type": settings.GRAPHRAG_CONFIG['RESPONSE_TYPE']
-        }
-        
+        search_params = self._search_params(query, 'global')
         return await self.search_with_timeout(api.global_search, **search_params)
     
     async def local_search(self, query: str) -> Tuple[str, str]:
@@ -133,19 +291,7 @@ class GraphRAGService:
         
         logger.info(f"Performing Local Search for: {query}")
         
-        search_params = {
-            "config": self._data["config"],
-            "query": query,
-            "entities": self._data["entities"],
-            "communities": self._data["communities"],
-            "community_reports": self._data["community_reports"],
-            "text_units": self._data["text_units"],
-            "relationships": self._data["relationships"],
-            "covariates": None,
-            "community_level": settings.GRAPHRAG_CONFIG['COMMUNITY_LEVEL'],
-            "response_type": settings.GRAPHRAG_CONFIG['RESPONSE_TYPE']
-        }
-        
+        search_params = self._search_params(query, 'local')
         return await self.search_with_timeout(api.local_search, **search_params)
     
     async def basic_search(self, query: str) -> Tuple[str, str]:
@@ -158,41 +304,235 @@ class GraphRAGService:
         
         logger.info(f"Performing Basic Search for: {query}")
         
-        search_params = {
-            "config": self._data["config"],
-            "query": query,
-            "text_units": self._data["text_units"]
-        }
-        
+        search_params = self._search_params(query, 'basic')
         return await self.search_with_timeout(api.basic_search, **search_params)
+    
+    async def search(self, query: str, search_type: str) -> Tuple[str, str]:
+        """Dispatch a query to the search method matching search_type."""
+        if search_type == 'global':
+            return await self.global_search(query)
+        elif search_type == 'local':
+            return await self.local_search(query)
+        elif search_type == 'basic':
+            return await self.basic_search(query)
+        else:
+            raise ValueError(f"Unknown search type: {search_type}")
+    
+    def supports_streaming(self, search_type: str) -> bool:
+        """Whether the installed graphrag exposes a streaming API for search_type."""
+        return hasattr(api, f"{search_type}_search_streaming")
+    
+    async def search_streaming(self, query: str, search_type: str) -> AsyncIterator[str]:
+        """
+        Stream the answer for a query as GraphRAG generates it.
+        Only valid when supports_streaming(search_type) is True.
+        """
+        if not self.is_ready():
+            yield "GraphRAG service not initialized"
+            return
+        
+        logger.info(f"Performing streaming {search_type} search for: {query}")
+        
+        stream_func = getattr(api, f"{search_type}_search_streaming")
+        async for chunk in stream_func(**self._search_params(query, search_type)):
+            yield chunk
+
+class SearchBatcher:
+    """
+    Collects concurrent search requests for a short window and dispatches them together.
+    Runs on the shared event loop so every WSGI worker thread shares one queue.
+    """
+    
+    def __init__(self, service: GraphRAGService, batch_size: int = 8,
+                 window_ms: int = 50, max_pending: int = 100):
+        self._service = service
+        self.batch_size = batch_size
+        self.window = window_ms / 1000
+        self.max_pending = max_pending
+        self._reset()
+    
+    def _reset(self) -> None:
+        self._queue = None
+        self._tasks = set()
+        self._lock = threading.Lock()
+    
+    def start(self) -> None:
+        """Start the queue worker on the shared loop (safe to call repeatedly)."""
+        with self._lock:
+            if self._queue is not None:
+                return
+            
+            run_async(self._start_worker())
+            logger.info(f"Search batcher started (batch size {self.batch_size}, window {self.window * 1000:.0f}ms)")
+    
+    def submit(self, query: str, search_type: str, timeout: float) -> Tuple[str, str]:
+        """Queue a query from a synchronous caller and block until its result is ready."""
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(self._enqueue(query, search_type), _LOOP)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            # Withdraw the query; cancelling also cancels its waiter future on the loop,
+            # so a batch that hasn't dispatched it yet skips the search
+            future.cancel()
+            raise
+    
+    async def _start_worker(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._spawn(self._run())
+    
+    def _spawn(self, coro) -> None:
+        # Keep a reference so running tasks are not garbage collected
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _enqueue(self, query: str, search_type: str) -> Tuple[str, str]:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((query, search_type, future))
+        return await future
+    
+    async def _run(self) -> None:
+        """Drain the queue into batches of up to batch_size or one window, whichever is first."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Dispatch without waiting so the next batch can start collecting
+            self._spawn(self._dispatch(batch))
+    
+    async def _dispatch(self, batch) -> None:
+        # Identical queries in the same batch share a single search. Queries whose
+        # caller already gave up are dropped rather than searched
+        waiters = {}
+        for query, search_type, future in batch:
+            if future.cancelled():
+                continue
+            waiters.setdefault((search_type, normalize_query(query)), (query, []))[1].append(future)
+        if not waiters:
+            return
+        
+        logger.info(f"Dispatching batch of {len(batch)} queries ({len(waiters)} unique)")
+        results = await asyncio.gather(
+            *(self._service.search(query, search_type)
+              for (search_type, _), (query, _) in waiters.items()),
+            return_exceptions=True
+        )
+        
+        for (_, futures), result in zip(waiters.values(), results):
+            for future in futures:
+                # The caller may have timed out while the search ran, cancelling its future
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
 
 # Global service instance
 graphrag_service = GraphRAGService()
 
+# Global batcher that all chat queries are submitted through
+search_batcher = SearchBatcher(
+    graphrag_service,
+    batch_size=settings.GRAPHRAG_CONFIG.get('BATCH_SIZE', 8),
+    window_ms=settings.GRAPHRAG_CONFIG.get('BATCH_WINDOW_MS', 50)
+)
+
+def _after_fork() -> None:
+    # Threads don't survive fork: when gunicorn preloads the app, each worker needs
+    # its own loop thread and queue. The loaded dataframes are inherited copy-on-write
+    _start_loop()
+    search_batcher._reset()
+
+os.register_at_fork(after_in_child=_after_fork)
+
+def normalize_query(query: str) -> str:
+    """Normalise a query for cache lookups (case and whitespace insensitive)."""
+    return ' '.join(query.lower().split())
+
+class QueryCache:
+    """
+    Thread-safe LRU cache of search results keyed by (search_type, normalised query).
+    Entries optionally expire after `ttl` seconds.
+    """
+    
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Tuple[str, str]) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: Tuple[str, str], value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        if self.maxsize <= 0:
+            return
+        
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> int:
+        """Remove all entries and return how many were dropped."""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# Global cache of serialised search responses
+query_cache = QueryCache(
+    maxsize=settings.GRAPHRAG_CONFIG.get('CACHE_SIZE', 256),
+    ttl=settings.GRAPHRAG_CONFIG.get('CACHE_TTL')
+)
+
 def format_response(response: str) -> str:
     """Format the response text for better readability in web interface."""
     if not response:
         return response
     
-    import re
-    
     # Clean up the response
     formatted = response.strip()
     
     # Convert bullet points to HTML-friendly format
-    formatted = re.sub(r'^[•·\-\*]\s+', '• ', formatted, flags=re.MULTILINE)
+    formatted = _BULLET_RE.sub('• ', formatted)
     
     # Add proper spacing
-    formatted = re.sub(r'\n\n+', '\n\n', formatted)
+    formatted = _BLANKS_RE.sub('\n\n', formatted)
     
-    # Bold important terms (you can customize this based on your domain)
-    important_terms = [
-        'Cost Rental', 'Housing Agency', 'Local Authority', 
-        'Dublin', 'Ireland', 'Government', 'Citizen'
-    ]
-    
-    for term in important_terms:
-        formatted = re.sub(f'\\b({term})\\b', f'**{term}**', formatted, flags=re.IGNORECASE)
+    # Bold important terms in a single pass over the text
+    formatted = _TERMS_RE.sub(
+        lambda m: f'**{_TERMS_CANONICAL[m.group(1).lower()]}**', formatted
+    )
     
     return formatted
 
@@ -201,8 +541,5 @@ def format_context_data(context_data: str) -> str:
     if not context_data or context_data.strip() == "":
         return "No context data available"
     
-    # Limit context data length for web display
-    if len(context_data) > 1000:
-        return f"{context_data[:1000]}... (truncated)"
-    
+    # Already cut to CONTEXT_MAX characters (plus a truncation marker) by search_with_timeout
     return context_data 
\ No newline at end of file
@@ -16,6 +16,9 @@ urlpatterns = [
     # AJAX endpoint for processing chat queries
     path('query/', views.ChatQueryView.as_view(), name='query'),
     
+    # Admin endpoint for clearing the query result cache
+    path('cache/clear/', views.clear_cache, name='clear_cache'),
+    
     # Health check endpoint
     path('health/', views.health_check, name='health'),
 ] 
\ No newline at end of file
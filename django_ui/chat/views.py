@@ -3,20 +3,48 @@ Django Views for GraphRAG Chat Application
 """
 
 import logging
-import asyncio
 import json
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from django.contrib.admin.views.decorators import staff_member_required
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils.decorators import method_decorator
 from django.views import View
 from asgiref.sync import sync_to_async
-from .services import graphrag_service, format_response, format_context_data
+from . import services
+from .services import (
+    graphrag_service, search_batcher, query_cache, normalize_query, iter_async,
+    format_response, format_context_data
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Set up logging
 logger = logging.getLogger('chat')
 
+# Largest request body accepted by the query endpoint (queries are short text)
+MAX_QUERY_BODY_BYTES = 8192
+
+def _loads(body: bytes) -> dict:
+    """Parse a JSON request body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+def _dumps(data: dict) -> bytes:
+    """Serialise a response payload to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode()
+
+def _sse(data: dict) -> bytes:
+    """Encode a payload as a single server-sent event."""
+    return b'data: ' + _dumps(data) + b'\n\n'
+
 def index(request):
     """
     Main chat interface view.
@@ -107,13 +135,23 @@ class ChatQueryView(View):
     def post(self, request):
         """
         Handle POST requests for chat queries.
-        Expected JSON payload: {'query': str, 'search_type': str}
+        Expected JSON payload: {'query': str, 'search_type': str, 'stream': bool (optional)}
+        With stream=true the answer is sent as server-sent events when the installed
+        graphrag supports streaming, otherwise the usual JSON response is returned.
         """
         try:
+            # Reject oversized bodies before spending any time parsing them
+            if len(request.body) > MAX_QUERY_BODY_BYTES:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'Request body too large'
+                }, status=413)
+            
             # Parse JSON request body
-            data = json.loads(request.body)
+            data = _loads(request.body)
             query = data.get('query', '').strip()
             search_type = data.get('search_type', 'global').lower()
+            stream = bool(data.get('stream', False))
             
             # Validate input
             if not query:
@@ -130,31 +168,54 @@ class ChatQueryView(View):
             
             logger.info(f"Received {search_type} search query: {query}")
             
-            # Check if GraphRAG service is ready
+            # Data is loaded at startup (ChatConfig.ready); refuse queries if that failed
             if not graphrag_service.is_ready():
-                logger.info("GraphRAG service not ready, initializing...")
-                if not graphrag_service.load_data():
-                    return JsonResponse({
-                        'success': False,
-                        'error': 'Failed to initialize GraphRAG service. Please try again.'
-                    }, status=500)
+                return JsonResponse({
+                    'success': False,
+                    'error': 'GraphRAG service is not ready. Please try again shortly.'
+                }, status=503)
+            
+            # Serve repeated queries from the cache without searching again
+            cache_key = (search_type, normalize_query(query))
+            cached = query_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Serving cached {search_type} search result")
+                return HttpResponse(
+                    _dumps({'success': True, **cached, 'query': query}),
+                    content_type='application/json'
+                )
+            
+            if stream and graphrag_service.supports_streaming(search_type):
+                return self._stream_search(query, search_type)
             
             # Perform the search based on type
             try:
-                # Use Django's async support to run the search
-                response, context = asyncio.run(self._perform_search(query, search_type))
+                # Queue the search so concurrent queries are dispatched together
+                response, context = search_batcher.submit(
+                    query, search_type,
+                    timeout=services.SEARCH_TIMEOUT + 5
+                )
                 
                 # Format the response for web display
                 formatted_response = format_response(response)
                 formatted_context = format_context_data(context)
                 
-                return JsonResponse({
-                    'success': True,
+                # The cache is shared by every spelling of the query, so it holds
+                # only the result; each response echoes its own request's query
+                result = {
                     'response': formatted_response,
                     'context': formatted_context,
-                    'search_type': search_type,
-                    'query': query
-                })
+                    'search_type': search_type
+                }
+                
+                # Failed or timed out searches come back without context; don't cache those
+                if context:
+                    query_cache.set(cache_key, result)
+                
+                return HttpResponse(
+                    _dumps({'success': True, **result, 'query': query}),
+                    content_type='application/json'
+                )
                 
             except Exception as e:
                 logger.error(f"Search execution error: {str(e)}", exc_info=True)
@@ -163,7 +224,8 @@ class ChatQueryView(View):
                     'error': f'Search failed: {str(e)}'
                 }, status=500)
                 
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError
             return JsonResponse({
                 'success': False,
                 'error': 'Invalid JSON in request body'
@@ -175,20 +237,51 @@ class ChatQueryView(View):
                 'success': False,
                 'error': 'An unexpected error occurred. Please try again.'
             }, status=500)
-    
-    async def _perform_search(self, query: str, search_type: str):
+
+    def _stream_search(self, query: str, search_type: str) -> StreamingHttpResponse:
         """
-        Perform the actual search based on the search type.
-        This method runs the appropriate GraphRAG search function.
+        Stream the answer as server-sent events while GraphRAG generates it.
+        Emits {'delta': str} per chunk, then {'done': true, 'response': str} with
+        the formatted full answer, or {'error': str} if the search fails.
         """
-        if search_type == 'global':
-            return await graphrag_service.global_search(query)
-        elif search_type == 'local':
-            return await graphrag_service.local_search(query)
-        elif search_type == 'basic':
-            return await graphrag_service.basic_search(query)
-        else:
-            raise ValueError(f"Unknown search type: {search_type}")
+        def events():
+            chunks = []
+            try:
+                for chunk in iter_async(
+                    graphrag_service.search_streaming(query, search_type),
+                    timeout=services.SEARCH_TIMEOUT
+                ):
+                    chunks.append(chunk)
+                    yield _sse({'delta': chunk})
+                
+                yield _sse({
+                    'done': True,
+                    'response': format_response(''.join(chunks)),
+                    'search_type': search_type,
+                    'query': query
+                })
+            except Exception as e:
+                logger.error(f"Streaming search error: {str(e)}", exc_info=True)
+                yield _sse({'error': f'Search failed: {str(e)}'})
+        
+        response = StreamingHttpResponse(events(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+@staff_member_required
+@require_http_methods(["POST"])
+def clear_cache(request):
+    """
+    Clear all cached search results.
+    Restricted to staff users (log in via the Django admin first).
+    """
+    cleared = query_cache.clear()
+    logger.info(f"Query cache cleared ({cleared} entries)")
+    
+    return JsonResponse({
+        'success': True,
+        'cleared': cleared
+    })
 
 @require_http_methods(["GET"])
 def health_check(request):
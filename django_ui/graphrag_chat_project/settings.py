@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -20,6 +21,9 @@ load_dotenv()
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# The repository root holds graphrag_common, shared with the Gradio UI and evaluation
+sys.path.append(str(BASE_DIR.parent))
+
 # GraphRAG Configuration - Path to the project data
 GRAPHRAG_PROJECT_PATH = os.path.abspath(os.path.join(BASE_DIR, "..", "my_graphrag_project"))
 GRAPHRAG_OUTPUT_PATH = os.path.join(GRAPHRAG_PROJECT_PATH, "output")
@@ -142,6 +146,12 @@ GRAPHRAG_CONFIG = {
     'RESPONSE_TYPE': 'Multiple Paragraphs',
     'SEARCH_TIMEOUT': 120,  # 2 minutes timeout
     'DEFAULT_MODEL': 'gpt-3.5-turbo-1106',  # Fixed model for consistency
+    'CONTEXT_MAX': 1000,  # Max characters of search context returned to the browser
+    'CACHE_SIZE': 256,  # Max cached (search_type, query) results, 0 disables caching
+    'CACHE_TTL': None,  # Seconds before a cached result expires, None to keep until evicted
+    'BATCH_SIZE': 8,  # Max concurrent queries dispatched together
+    'BATCH_WINDOW_MS': 50,  # How long to wait for a batch to fill before dispatching
+    'PRELOAD': os.getenv('GRAPHRAG_PRELOAD', 'False').lower() == 'true',  # Load data and start the batcher at boot (set by gunicorn.conf.py)
 }
 
 # Logging Configuration
@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration for the GraphRAG chat application.
+Usage (from this directory): gunicorn graphrag_chat_project.wsgi
+"""
+
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# GraphRAG searches can run up to SEARCH_TIMEOUT (120s) plus batching overhead
+timeout = 150
+
+# Import the app in the master before forking, so ChatConfig.ready() loads the
+# GraphRAG dataframes once and every worker shares them copy-on-write instead
+# of each holding (and decompressing) its own copy
+preload_app = True
+
+# Boot-time preloading is off by default (tests, shells and other commands import
+# the app too); gunicorn is a serving entry point, so turn it on here
+os.environ.setdefault('GRAPHRAG_PRELOAD', 'true')
@@ -13,154 +13,484 @@ This script evaluates the graphRAG system by:
 
 import json
 import asyncio
+import hashlib
+import heapq
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import os
 from pathlib import Path
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Union
+from dataclasses import dataclass
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 from datetime import datetime
 import re
 
-# Add the parent directory to sys.path to import from graphrag_ui
+# Add the parent directory to sys.path to import from graphrag_ui and graphrag_common
 sys.path.append(str(Path(__file__).parent.parent))
+from graphrag_common.indexer_cache import install_adapter_cache
+from graphrag_common.tables import PARQUET_TABLES, REQUIRED_COLS, LOW_CARD_COLS
 
-# Import graphRAG modules
-import graphrag.api as api
-from graphrag.config.load_config import load_config
+# graphRAG modules are imported on first use (see _api) since package init is slow
+api = None
 from dotenv import load_dotenv
 
 # Import evaluation libraries
 try:
+    import torch
     from sentence_transformers import SentenceTransformer
-    from sklearn.metrics.pairwise import cosine_similarity
-    import nltk
-    from nltk.translate.bleu_score import sentence_bleu, SmoothingFunction
-    nltk.download('punkt', quiet=True)
+    from nltk.translate.bleu_score import corpus_bleu, sentence_bleu, SmoothingFunction
 except ImportError as e:
     print(f"Missing required packages: {e}")
     sys.exit(1)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialise to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+def _api():
+    """Import graphrag.api on first use and return it."""
+    global api
+    if api is None:
+        import graphrag.api as api
+    return api
+
+class OnnxSentenceEncoder:
+    """
+    ONNX Runtime stand-in for SentenceTransformer.encode (mean pooling + L2 norm).
+    For an optimised int8 model, export once and point `model_dir` at the output:
+        optimum-cli export onnx --model sentence-transformers/all-MiniLM-L6-v2 --optimize O3 <dir>
+        optimum-cli onnxruntime quantize --onnx_model <dir> --avx512 -o <dir>
+    If `model_dir` doesn't exist, a plain FP32 export is created there on first use.
+    """
+    
+    def __init__(self, model_dir: Path, model_id: str = "sentence-transformers/all-MiniLM-L6-v2"):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+        
+        model_dir = Path(model_dir)
+        if model_dir.exists():
+            self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+            self.model = ORTModelForFeatureExtraction.from_pretrained(model_dir)
+        else:
+            print(f"Exporting {model_id} to ONNX at {model_dir}...")
+            self.tokenizer = AutoTokenizer.from_pretrained(model_id)
+            self.model = ORTModelForFeatureExtraction.from_pretrained(model_id, export=True)
+            self.model.save_pretrained(model_dir)
+            self.tokenizer.save_pretrained(model_dir)
+    
+    def encode(self, texts: List[str], batch_size: int = 64, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False) -> np.ndarray:
+        """Embed texts with the same interface and output as SentenceTransformer.encode."""
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                return_tensors="np"
+            )
+            hidden = np.asarray(self.model(**inputs).last_hidden_state)
+            
+            # Mean-pool token embeddings, ignoring padding
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            
+            if normalize_embeddings:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled)
+        
+        return np.concatenate(batches) if batches else np.empty((0, 0), dtype=np.float32)
+
+class EmbeddingCache:
+    """
+    Sentence embedding cache kept in memory and persisted to a parquet file between runs.
+    Entries are keyed by SHA-256 of the model name and text; vectors are L2-normalised.
+    """
+    
+    def __init__(self, model, model_name: str, path: Path):
+        self.model = model
+        self.model_name = model_name
+        self.path = Path(path)
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._dirty = False
+        
+        if self.path.exists():
+            try:
+                df = pd.read_parquet(self.path)
+                self._vectors = {
+                    key: np.asarray(vector, dtype=np.float32)
+                    for key, vector in zip(df['key'], df['embedding'])
+                }
+                print(f"Loaded {len(self._vectors)} cached embeddings")
+            except Exception as e:
+                print(f"Could not load embedding cache: {e}")
+    
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\n{text}".encode()).hexdigest()
+    
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Return embeddings for texts, encoding only those not already cached."""
+        keys = [self._key(text) for text in texts]
+        missing = {key: text for key, text in zip(keys, texts) if key not in self._vectors}
+        
+        if missing:
+            with torch.inference_mode():
+                vectors = self.model.encode(
+                    list(missing.values()),
+                    batch_size=batch_size,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True
+                )
+            # FP16 models return float16 vectors; keep the cache uniformly float32
+            self._vectors.update(zip(missing.keys(), vectors.astype(np.float32)))
+            self._dirty = True
+        
+        return np.stack([self._vectors[key] for key in keys])
+    
+    def flush(self):
+        """Write the cache to disk if anything new was encoded."""
+        if not self._dirty:
+            return
+        df = pd.DataFrame({
+            'key': list(self._vectors.keys()),
+            'embedding': [vector.tolist() for vector in self._vectors.values()]
+        })
+        df.to_parquet(self.path, index=False)
+        self._dirty = False
+
+@dataclass(frozen=True)
+class GTArtifacts:
+    """Everything the metrics derive from a ground truth, computed once per test case."""
+    numbers: frozenset
+    terms: frozenset
+    schemes: frozenset
+    tokens: List[str]
+    embedding: np.ndarray
+
+class QueryResponseCache:
+    """
+    Persistent GraphRAG response cache backed by SQLite.
+    Entries are keyed by SHA-1 of the search type, query and a hash of the config and
+    index files, so re-indexing or changing settings never serves a stale answer.
+    """
+    
+    def __init__(self, path: Path, cfg_hash: str):
+        self.cfg_hash = cfg_hash
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL)"
+        )
+        self._conn.commit()
+    
+    def _key(self, query: str, search_type: str) -> str:
+        return hashlib.sha1(f"{search_type}|{query}|{self.cfg_hash}".encode()).hexdigest()
+    
+    def get(self, query: str, search_type: str):
+        row = self._conn.execute(
+            "SELECT response FROM responses WHERE key = ?", (self._key(query, search_type),)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def set(self, query: str, search_type: str, response: str):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, response) VALUES (?, ?)",
+            (self._key(query, search_type), response)
+        )
+        self._conn.commit()
+
 class GraphRAGEvaluator:
-    def __init__(self, project_dir: str = "../my_graphrag_project"):
-        """Initialize the evaluator with project directory."""
+    # Patterns and keywords used by calculate_factual_accuracy, built once
+    _NUM_RE = re.compile(r'[\d,]+(?:\.\d+)?')
+    _TERM_RE = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+    _SCHEME_KW = frozenset({
+        'First Home Scheme', 'Help to Buy', 'Local Authority', 'HAP', 'RAS', 
+        'Cost Rental', 'Vacant Property', 'Affordable Purchase', 'Enhanced',
+        'Dublin', 'Cork', 'Galway', 'fresh start'
+    })
+    _SCHEME_KW_LOWER = frozenset(kw.lower() for kw in _SCHEME_KW)
+    # Word/punctuation tokenizer for BLEU (no Punkt model needed)
+    _TOK_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+    # One scan finds every keyword; the lookahead keeps overlapping matches, like `in` did
+    _SCHEME_RE = re.compile(
+        '(?=(' + '|'.join(map(re.escape, sorted(_SCHEME_KW_LOWER, key=len, reverse=True))) + '))'
+    )
+
+    def __init__(self, project_dir: str = "../my_graphrag_project", concurrency: int = 8,
+                 use_onnx: bool = False, use_query_cache: bool = False):
+        """
+        Initialize the evaluator with project directory.
+        `concurrency` caps how many test cases are queried at the same time.
+        `use_onnx` computes relevance embeddings with ONNX Runtime instead of PyTorch.
+        `use_query_cache` reuses GraphRAG responses from earlier runs with the same
+        config, prompts and index. Off by default: LLM answers vary between runs, and a
+        fresh evaluation should measure fresh answers.
+        """
         self.project_dir = Path(project_dir).resolve()
         self.test_cases_path = Path("tests/test_cases_simple.json")
+        self.concurrency = concurrency
         
         # Initialize evaluation models
         print("Loading evaluation models...")
-        self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
+        if use_onnx:
+            model_name = 'all-MiniLM-L6-v2-onnx'
+            self.sentence_model = OnnxSentenceEncoder(Path(__file__).parent / "models" / model_name)
+        else:
+            model_name = 'all-MiniLM-L6-v2'
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            self.sentence_model = SentenceTransformer(model_name, device=device)
+            if device == "cuda":
+                # Half precision halves embedding bandwidth without changing cosine rankings
+                self.sentence_model = self.sentence_model.half()
+        self.embedding_cache = EmbeddingCache(
+            self.sentence_model,
+            model_name,
+            Path(__file__).parent / ".emb_cache.parquet"
+        )
         self.smoothing = SmoothingFunction().method1
         
         # Load GraphRAG data
         print("Loading GraphRAG data...")
         self.data = self._load_graphrag_data()
+        self._engine_cache: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+        # The same frames are passed to every search, so convert them to graphrag models once
+        install_adapter_cache()
+        self.query_cache = None
+        if use_query_cache:
+            self.query_cache = QueryResponseCache(
+                Path(__file__).parent / ".query_cache" / "responses.sqlite",
+                self._config_hash()
+            )
         
     def _load_graphrag_data(self) -> Dict[str, Any]:
         """Load GraphRAG configuration and data files."""
         try:
+            from graphrag.config.load_config import load_config
             config = load_config(self.project_dir)
             
-            # Load parquet files
-            entities = pd.read_parquet(self.project_dir / "output" / "entities.parquet")
-            communities = pd.read_parquet(self.project_dir / "output" / "communities.parquet")
-            community_reports = pd.read_parquet(self.project_dir / "output" / "community_reports.parquet")
-            text_units = pd.read_parquet(self.project_dir / "output" / "text_units.parquet")
-            relationships = pd.read_parquet(self.project_dir / "output" / "relationships.parquet")
+            # Load parquet files concurrently so reads and decompression overlap
+            output_dir = self.project_dir / "output"
+            with ThreadPoolExecutor(max_workers=len(PARQUET_TABLES)) as executor:
+                futures = {
+                    name: executor.submit(self._read_table, output_dir / f"{name}.parquet", name)
+                    for name in PARQUET_TABLES
+                }
+                data = {name: future.result() for name, future in futures.items()}
             
-            return {
-                "config": config,
-                "entities": entities,
-                "communities": communities,
-                "community_reports": community_reports,
-                "text_units": text_units,
-                "relationships": relationships
-            }
+            return {"config": config, **data}
         except Exception as e:
             print(f"Error loading GraphRAG data: {e}")
             sys.exit(1)
 
+    def _config_hash(self) -> str:
+        """
+        Hash the GraphRAG config, the contents of the prompt files it points to and
+        the size/mtime of each index file.
+        """
+        config = self.data["config"]
+        dumped = config.model_dump(mode="json") if hasattr(config, "model_dump") else str(config)
+        state = {
+            "config": dumped,
+            "prompts": {},
+            "files": {}
+        }
+        for prompt in sorted(self._prompt_paths(dumped)):
+            path = self.project_dir / prompt
+            if path.is_file():
+                state["prompts"][prompt] = hashlib.sha1(path.read_bytes()).hexdigest()
+        for name in PARQUET_TABLES:
+            stat = (self.project_dir / "output" / f"{name}.parquet").stat()
+            state["files"][name] = [stat.st_size, stat.st_mtime_ns]
+        return hashlib.sha1(json.dumps(state, sort_keys=True, default=str).encode()).hexdigest()
+
+    @classmethod
+    def _prompt_paths(cls, node: Any) -> set:
+        """Collect the prompt file settings (`prompt`, `map_prompt`, ...) from a dumped config."""
+        paths = set()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key.endswith("prompt") and isinstance(value, str):
+                    paths.add(value)
+                else:
+                    paths |= cls._prompt_paths(value)
+        elif isinstance(node, list):
+            for value in node:
+                paths |= cls._prompt_paths(value)
+        return paths
+
+    def _read_table(self, path: Path, name: str) -> pd.DataFrame:
+        """
+        Read only the columns search needs from a parquet file, then store the
+        LOW_CARD_COLS string columns as categoricals to cut memory.
+        """
+        available = set(pq.read_schema(path).names)
+        columns = [col for col in REQUIRED_COLS[name] if col in available]
+        df = pd.read_parquet(path, columns=columns, engine="pyarrow")
+        
+        for col in LOW_CARD_COLS.get(name, []):
+            if col in df.columns:
+                df[col] = df[col].astype("category")
+        
+        return df
+
     def load_test_cases(self) -> List[Dict]:
         """Load test cases from JSON file."""
         try:
-            with open(self.test_cases_path, 'r') as f:
-                data = json.load(f)
-                return data['test_cases']
+            data = _json_loads(Path(self.test_cases_path).read_bytes())
+            return data['test_cases']
         except Exception as e:
             print(f"Error loading test cases: {e}")
             sys.exit(1)
 
+    def _search_engine(self, search_type: str) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Return the search API function and its fixed arguments for a search type.
+        Built once per search type and reused for every question.
+        """
+        engine = self._engine_cache.get(search_type)
+        if engine is not None:
+            return engine
+        
+        api = _api()
+        search_params = {"config": self.data["config"]}
+        if search_type == "Global Search":
+            search = api.global_search
+            search_params.update({
+                "entities": self.data["entities"],
+                "communities": self.data["communities"],
+                "community_reports": self.data["community_reports"],
+                "community_level": 2,
+                "dynamic_community_selection": False,
+                "response_type": "Multiple Paragraphs"
+            })
+        elif search_type == "Local Search":
+            search = api.local_search
+            search_params.update({
+                "entities": self.data["entities"],
+                "communities": self.data["communities"],
+                "community_reports": self.data["community_reports"],
+                "text_units": self.data["text_units"],
+                "relationships": self.data["relationships"],
+                "covariates": None,
+                "community_level": 2,
+                "response_type": "Multiple Paragraphs"
+            })
+        else:  # Basic Search
+            search = api.basic_search
+            search_params.update({
+                "text_units": self.data["text_units"]
+            })
+        
+        engine = self._engine_cache[search_type] = (search, search_params)
+        return engine
+
+    @staticmethod
+    def is_error_response(response) -> bool:
+        """True for the placeholder strings query_graphrag returns instead of an answer."""
+        return (
+            not isinstance(response, str)
+            or response.startswith("Error:")
+            or response == "No response generated"
+        )
+
     async def query_graphrag(self, query: str, search_type: str = "Global Search") -> str:
         """Query the GraphRAG system and return the response."""
+        if self.query_cache is not None:
+            cached = self.query_cache.get(query, search_type)
+            if cached is not None:
+                return cached
+        
         try:
-            search_params = {
-                "config": self.data["config"],
-                "query": query
-            }
-
-            if search_type == "Global Search":
-                search_params.update({
-                    "entities": self.data["entities"],
-                    "communities": self.data["communities"],
-                    "community_reports": self.data["community_reports"],
-                    "community_level": 2,
-                    "dynamic_community_selection": False,
-                    "response_type": "Multiple Paragraphs"
-                })
-                response, _ = await api.global_search(**search_params)
-                
-            elif search_type == "Local Search":
-                search_params.update({
-                    "entities": self.data["entities"],
-                    "communities": self.data["communities"],
-                    "community_reports": self.data["community_reports"],
-                    "text_units": self.data["text_units"],
-                    "relationships": self.data["relationships"],
-                    "covariates": None,
-                    "community_level": 2,
-                    "response_type": "Multiple Paragraphs"
-                })
-                response, _ = await api.local_search(**search_params)
-                
-            else:  # Basic Search
-                search_params.update({
-                    "text_units": self.data["text_units"]
-                })
-                response, _ = await api.basic_search(**search_params)
-                
-            return response if response else "No response generated"
+            search, search_params = self._search_engine(search_type)
+            response, _ = await search(query=query, **search_params)
+            
+            if not response:
+                return "No response generated"
+            
+            # Only real answers are cached; errors and empty responses are retried next run
+            if self.query_cache is not None and isinstance(response, str):
+                self.query_cache.set(query, search_type, response)
+            return response
             
         except Exception as e:
             print(f"Error querying GraphRAG: {e}")
             return f"Error: {str(e)}"
 
-    def calculate_factual_accuracy(self, response: str, ground_truth: str) -> float:
+    @classmethod
+    def _extract_facts(cls, text: str) -> Tuple[frozenset, frozenset, frozenset]:
+        """Extract the numbers, key terms and scheme keywords factual accuracy compares."""
+        numbers = frozenset(cls._NUM_RE.findall(text.replace(',', '')))
+        # Key terms are capitalized words/phrases; schemes match case-insensitively
+        terms = frozenset(cls._TERM_RE.findall(text))
+        schemes = frozenset(cls._SCHEME_RE.findall(text.lower()))
+        return numbers, terms, schemes
+
+    @classmethod
+    def _tokenize(cls, text: str) -> List[str]:
+        """Lowercase and split text into word and punctuation tokens."""
+        return cls._TOK_RE.findall(text.lower())
+
+    def build_gt_artifacts(self, test_cases: List[Dict]) -> Dict[str, GTArtifacts]:
+        """
+        Precompute ground-truth facts, tokens and embeddings for every test case, with
+        one batched encode for all ground truths. Reused across all search types.
+        """
+        truths = [test_case['ground_truth'] for test_case in test_cases]
+        embeddings = self.embedding_cache.encode(truths, batch_size=64) if truths else []
+        
+        artifacts = {}
+        for test_case, truth, embedding in zip(test_cases, truths, embeddings):
+            numbers, terms, schemes = self._extract_facts(truth)
+            artifacts[test_case['id']] = GTArtifacts(
+                numbers=numbers,
+                terms=terms,
+                schemes=schemes,
+                tokens=self._tokenize(truth),
+                embedding=embedding
+            )
+        return artifacts
+
+    def _as_artifacts(self, ground_truth: Union[str, GTArtifacts]) -> GTArtifacts:
+        """Accept either a raw ground truth string or its precomputed artifacts."""
+        if isinstance(ground_truth, GTArtifacts):
+            return ground_truth
+        return self.build_gt_artifacts([{'id': None, 'ground_truth': ground_truth}])[None]
+
+    def calculate_factual_accuracy(self, response: str, ground_truth: Union[str, GTArtifacts]) -> float:
         """
         Calculate factual accuracy by comparing key entities/numbers in response vs ground truth.
         Simple implementation using keyword matching and number extraction.
         """
-        # Extract numbers from both texts
-        response_numbers = set(re.findall(r'[\d,]+(?:\.\d+)?', response.replace(',', '')))
-        truth_numbers = set(re.findall(r'[\d,]+(?:\.\d+)?', ground_truth.replace(',', '')))
-        
-        # Extract key terms (capitalized words, schemes, etc.)
-        response_terms = set(re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', response))
-        truth_terms = set(re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', ground_truth))
-        
-        # Add scheme-specific keywords
-        scheme_keywords = {
-            'First Home Scheme', 'Help to Buy', 'Local Authority', 'HAP', 'RAS', 
-            'Cost Rental', 'Vacant Property', 'Affordable Purchase', 'Enhanced',
-            'Dublin', 'Cork', 'Galway', 'fresh start'
-        }
-        
-        response_lower = response.lower()
-        truth_lower = ground_truth.lower()
-        
-        response_schemes = {kw for kw in scheme_keywords if kw.lower() in response_lower}
-        truth_schemes = {kw for kw in scheme_keywords if kw.lower() in truth_lower}
+        if isinstance(ground_truth, GTArtifacts):
+            truth_numbers, truth_terms, truth_schemes = (
+                ground_truth.numbers, ground_truth.terms, ground_truth.schemes
+            )
+        else:
+            truth_numbers, truth_terms, truth_schemes = self._extract_facts(ground_truth)
+        response_numbers, response_terms, response_schemes = self._extract_facts(response)
         
         # Calculate accuracy as intersection over union
         number_accuracy = len(response_numbers & truth_numbers) / max(len(truth_numbers), 1)
@@ -170,26 +500,36 @@ class GraphRAGEvaluator:
         # Weighted average (numbers are most important for factual accuracy)
         return (0.5 * number_accuracy + 0.3 * scheme_accuracy + 0.2 * term_accuracy)
 
-    def calculate_relevance(self, response: str, ground_truth: str) -> float:
+    def calculate_relevance(self, response: str, ground_truth: Union[str, GTArtifacts]) -> float:
         """Calculate semantic relevance using sentence embeddings."""
+        return self.calculate_relevance_batch([(response, ground_truth)])[0]
+
+    def calculate_relevance_batch(self, pairs: List[Tuple[str, Union[str, GTArtifacts]]]) -> List[float]:
+        """
+        Calculate semantic relevance for many (response, ground_truth) pairs with a single
+        batched encode of the responses not already in the embedding cache. Embeddings are
+        L2-normalised, so cosine similarity is a dot product.
+        """
+        if not pairs:
+            return []
         try:
-            # Generate embeddings
-            response_embedding = self.sentence_model.encode([response])
-            truth_embedding = self.sentence_model.encode([ground_truth])
-            
-            # Calculate cosine similarity
-            similarity = cosine_similarity(response_embedding, truth_embedding)[0][0]
-            return float(similarity)
+            truths = np.stack([self._as_artifacts(truth).embedding for _, truth in pairs])
+            responses = self.embedding_cache.encode([response for response, _ in pairs], batch_size=64)
+            similarities = (responses * truths).sum(axis=1)
+            return [float(similarity) for similarity in similarities]
         except Exception as e:
             print(f"Error calculating relevance: {e}")
-            return 0.0
+            return [0.0] * len(pairs)
 
-    def calculate_bleu_score(self, response: str, ground_truth: str) -> float:
+    def calculate_bleu_score(self, response: str, ground_truth: Union[str, GTArtifacts]) -> float:
         """Calculate BLEU score between response and ground truth."""
         try:
-            # Tokenize
-            response_tokens = nltk.word_tokenize(response.lower())
-            truth_tokens = nltk.word_tokenize(ground_truth.lower())
+            # Tokenize (precomputed artifacts already carry the ground truth tokens)
+            response_tokens = self._tokenize(response)
+            if isinstance(ground_truth, GTArtifacts):
+                truth_tokens = ground_truth.tokens
+            else:
+                truth_tokens = self._tokenize(ground_truth)
             
             # Calculate BLEU score
             bleu_score = sentence_bleu(
@@ -202,8 +542,52 @@ class GraphRAGEvaluator:
             print(f"Error calculating BLEU score: {e}")
             return 0.0
 
-    async def evaluate_single_case(self, test_case: Dict, search_type: str = "Global Search") -> Dict:
-        """Evaluate a single test case."""
+    def calculate_bleu_batch(self, pairs: List[Tuple[str, Union[str, GTArtifacts]]]) -> List[float]:
+        """Calculate per-case BLEU for (response, ground_truth) pairs."""
+        return [self.calculate_bleu_score(response, ground_truth) for response, ground_truth in pairs]
+
+    def calculate_corpus_bleu(self, pairs: List[Tuple[str, Union[str, GTArtifacts]]]) -> float:
+        """Calculate a single corpus-level BLEU over (response, ground_truth) pairs."""
+        if not pairs:
+            return 0.0
+        try:
+            hyps = [self._tokenize(response) for response, _ in pairs]
+            refs = [
+                [truth.tokens if isinstance(truth, GTArtifacts) else self._tokenize(truth)]
+                for _, truth in pairs
+            ]
+            return float(corpus_bleu(refs, hyps, smoothing_function=self.smoothing))
+        except Exception as e:
+            print(f"Error calculating corpus BLEU score: {e}")
+            return 0.0
+
+    async def evaluate_single_case(self, test_case: Dict, search_type: str = "Global Search",
+                                   gt: GTArtifacts = None) -> Dict:
+        """
+        Evaluate a single test case.
+        `gt` is the case's precomputed ground-truth artifacts, if available.
+        """
+        result = await self._query_case(test_case, search_type, gt)
+        
+        relevance = 0.0
+        bleu_score = 0.0
+        if not result['error']:
+            ground_truth = gt if gt is not None else test_case['ground_truth']
+            relevance, bleu_score = await asyncio.gather(
+                asyncio.to_thread(self.calculate_relevance, result['response'], ground_truth),
+                asyncio.to_thread(self.calculate_bleu_score, result['response'], ground_truth)
+            )
+        result['metrics']['relevance'] = relevance
+        result['metrics']['bleu_score'] = bleu_score
+        return result
+    
+    async def _query_case(self, test_case: Dict, search_type: str,
+                          gt: GTArtifacts = None) -> Dict:
+        """
+        Query GraphRAG for a test case and score its factual accuracy. The result's
+        metrics lack relevance and BLEU, which run_evaluation scores for all cases
+        in one batch and evaluate_single_case scores per case.
+        """
         question = test_case['question']
         ground_truth = test_case['ground_truth']
         test_id = test_case['id']
@@ -213,10 +597,16 @@ class GraphRAGEvaluator:
         # Query GraphRAG
         response = await self.query_graphrag(question, search_type)
         
-        # Calculate metrics
-        factual_accuracy = self.calculate_factual_accuracy(response, ground_truth)
-        relevance = self.calculate_relevance(response, ground_truth)
-        bleu_score = self.calculate_bleu_score(response, ground_truth)
+        # Failed queries get zero metrics and are excluded from the averages
+        error = self.is_error_response(response)
+        
+        # Calculate factual accuracy in a worker thread so it doesn't block other
+        # in-flight queries on the event loop
+        factual_accuracy = 0.0
+        if not error:
+            factual_accuracy = await asyncio.to_thread(
+                self.calculate_factual_accuracy, response, gt if gt is not None else ground_truth
+            )
         
         return {
             'id': test_id,
@@ -224,56 +614,135 @@ class GraphRAGEvaluator:
             'ground_truth': ground_truth,
             'response': response,
             'search_type': search_type,
+            'error': error,
             'metrics': {
-                'factual_accuracy': factual_accuracy,
-                'relevance': relevance,
-                'bleu_score': bleu_score
+                'factual_accuracy': factual_accuracy
             }
         }
 
-    async def run_evaluation(self, search_types: List[str] = ["Global Search"]) -> Dict:
-        """Run evaluation on all test cases."""
+    async def run_evaluation(self, search_types: List[str] = ["Global Search"],
+                             results_path: Path = None) -> Dict:
+        """
+        Run evaluation on all test cases.
+        Each scored case is appended to `results_path` (JSONL) as soon as its search
+        type finishes, so an interrupted run keeps everything completed so far.
+        """
         test_cases = self.load_test_cases()
         results = []
         
+        if results_path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            results_path = Path(f"evaluation_results_{timestamp}.jsonl")
+        results_path = Path(results_path)
+        
         print(f"Starting evaluation of {len(test_cases)} test cases...")
+        print(f"Streaming results to: {results_path}")
         
-        for search_type in search_types:
-            print(f"\n=== Evaluating with {search_type} ===")
-            
-            for i, test_case in enumerate(test_cases, 1):
-                print(f"Progress: {i}/{len(test_cases)}")
-                result = await self.evaluate_single_case(test_case, search_type)
-                results.append(result)
-        
-        # Calculate overall statistics
-        all_metrics = [r['metrics'] for r in results]
-        avg_metrics = {
-            'factual_accuracy': sum(m['factual_accuracy'] for m in all_metrics) / len(all_metrics),
-            'relevance': sum(m['relevance'] for m in all_metrics) / len(all_metrics),
-            'bleu_score': sum(m['bleu_score'] for m in all_metrics) / len(all_metrics)
-        }
+        # Ground truths don't change between search types, so derive their facts,
+        # tokens and embeddings once up front
+        gt_artifacts = await asyncio.to_thread(self.build_gt_artifacts, test_cases)
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        with open(results_path, 'ab') as out:
+            for search_type in search_types:
+                print(f"\n=== Evaluating with {search_type} ===")
+                completed = 0
+                
+                async def evaluate_case(test_case: Dict) -> Dict:
+                    nonlocal completed
+                    async with semaphore:
+                        result = await self._query_case(
+                            test_case, search_type, gt_artifacts[test_case['id']]
+                        )
+                    completed += 1
+                    print(f"Progress: {completed}/{len(test_cases)}")
+                    return result
+                
+                # Dispatch cases in question-length order so the queries in flight together
+                # have similar prompt sizes, then put results back in test case order
+                order = sorted(range(len(test_cases)), key=lambda i: len(test_cases[i]['question']))
+                gathered = await asyncio.gather(
+                    *(evaluate_case(test_cases[i]) for i in order),
+                    return_exceptions=True
+                )
+                case_results = [None] * len(test_cases)
+                for pos, result in zip(order, gathered):
+                    case_results[pos] = result
+                
+                batch = []
+                for test_case, result in zip(test_cases, case_results):
+                    if isinstance(result, Exception):
+                        print(f"Error evaluating {test_case['id']}: {result}")
+                        continue
+                    batch.append(result)
+                
+                # Embed every answered (response, ground truth) pair of the batch in
+                # one encode and score BLEU alongside it
+                print("Calculating relevance and BLEU scores...")
+                answered = [r for r in batch if not r['error']]
+                pairs = [(r['response'], gt_artifacts[r['id']]) for r in answered]
+                relevances, bleu_scores = await asyncio.gather(
+                    asyncio.to_thread(self.calculate_relevance_batch, pairs),
+                    asyncio.to_thread(self.calculate_bleu_batch, pairs)
+                )
+                for result in batch:
+                    result['metrics']['relevance'] = 0.0
+                    result['metrics']['bleu_score'] = 0.0
+                for result, relevance, bleu_score in zip(answered, relevances, bleu_scores):
+                    result['metrics']['relevance'] = relevance
+                    result['metrics']['bleu_score'] = bleu_score
+                for result in batch:
+                    out.write(_json_dumps(result) + b"\n")
+                out.flush()
+                self.embedding_cache.flush()
+                results.extend(batch)
+        
+        # Calculate overall statistics over the cases that got an answer
+        answered = [r for r in results if not r['error']]
+        metric_names = ['factual_accuracy', 'relevance', 'bleu_score']
+        if answered:
+            all_metrics = np.asarray(
+                [[r['metrics'][name] for name in metric_names] for r in answered],
+                dtype=np.float64
+            )
+            avg_metrics = {
+                **dict(zip(metric_names, all_metrics.mean(axis=0).tolist())),
+                'corpus_bleu': await asyncio.to_thread(
+                    self.calculate_corpus_bleu,
+                    [(r['response'], gt_artifacts[r['id']]) for r in answered]
+                )
+            }
+        else:
+            # Every query failed: there is nothing to average over
+            avg_metrics = {name: None for name in metric_names + ['corpus_bleu']}
+            avg_metrics['note'] = 'no answered cases'
         
         return {
             'timestamp': datetime.now().isoformat(),
             'total_cases': len(test_cases),
+            'failed_queries': len(results) - len(answered),
             'search_types': search_types,
             'average_metrics': avg_metrics,
+            'results_file': str(results_path),
             'detailed_results': results
         }
 
     def save_results(self, results: Dict, filename: str = None):
-        """Save evaluation results to JSON file."""
+        """
+        Save the evaluation summary to a JSON file.
+        Per-case results are already in the JSONL file written by run_evaluation.
+        """
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"evaluation_results_{timestamp}.json"
+            filename = f"evaluation_summary_{timestamp}.json"
         
         filepath = Path(filename)
+        summary = {key: value for key, value in results.items() if key != 'detailed_results'}
         
-        with open(filepath, 'w') as f:
-            json.dump(results, f, indent=2)
+        filepath.write_bytes(_json_dumps(summary, indent=True))
         
-        print(f"\nResults saved to: {filepath}")
+        print(f"\nSummary saved to: {filepath}")
         return filepath
 
     def print_summary(self, results: Dict):
@@ -284,28 +753,38 @@ class GraphRAGEvaluator:
         print(f"Total test cases: {results['total_cases']}")
         print(f"Search methods: {', '.join(results['search_types'])}")
         print(f"Evaluation date: {results['timestamp']}")
+        if results.get('failed_queries'):
+            print(f"Failed queries (excluded from averages): {results['failed_queries']}")
         
         print("\nAVERAGE METRICS:")
         print("-" * 30)
         avg = results['average_metrics']
+        if avg.get('factual_accuracy') is None:
+            print("No answered cases; averages unavailable")
+            return
         print(f"Factual Accuracy: {avg['factual_accuracy']:.3f}")
         print(f"Relevance:        {avg['relevance']:.3f}")
         print(f"BLEU Score:       {avg['bleu_score']:.3f}")
+        if 'corpus_bleu' in avg:
+            print(f"Corpus BLEU:      {avg['corpus_bleu']:.3f}")
         
         # Show top and bottom performers
-        detailed = results['detailed_results']
+        detailed = [r for r in results['detailed_results'] if not r.get('error')]
         if detailed:
             print("\nTOP PERFORMERS (by average score):")
             print("-" * 40)
             
-            # Calculate average score for each result
-            for result in detailed:
-                metrics = result['metrics']
-                avg_score = (metrics['factual_accuracy'] + metrics['relevance'] + metrics['bleu_score']) / 3
+            # Calculate average score for each result in one vectorised pass
+            scores = np.asarray(
+                [[r['metrics']['factual_accuracy'], r['metrics']['relevance'], r['metrics']['bleu_score']]
+                 for r in detailed],
+                dtype=np.float64
+            ).mean(axis=1)
+            for result, avg_score in zip(detailed, scores.tolist()):
                 result['avg_score'] = avg_score
             
-            # Sort by average score
-            top_results = sorted(detailed, key=lambda x: x['avg_score'], reverse=True)[:3]
+            # Only the top and bottom three are needed, so skip the full sorts
+            top_results = heapq.nlargest(3, detailed, key=lambda x: x['avg_score'])
             
             for i, result in enumerate(top_results, 1):
                 print(f"{i}. {result['id']}: {result['avg_score']:.3f}")
@@ -313,7 +792,7 @@ class GraphRAGEvaluator:
             
             print("\nLOWEST PERFORMERS:")
             print("-" * 20)
-            bottom_results = sorted(detailed, key=lambda x: x['avg_score'])[:3]
+            bottom_results = heapq.nsmallest(3, detailed, key=lambda x: x['avg_score'])
             
             for i, result in enumerate(bottom_results, 1):
                 print(f"{i}. {result['id']}: {result['avg_score']:.3f}")
@@ -324,8 +803,10 @@ async def main():
     print("GraphRAG Evaluation Tool")
     print("=" * 40)
     
-    # Initialize evaluator
-    evaluator = GraphRAGEvaluator()
+    # Initialize evaluator; set GRAPHRAG_EVAL_QUERY_CACHE=1 to reuse earlier answers
+    evaluator = GraphRAGEvaluator(
+        use_query_cache=os.getenv("GRAPHRAG_EVAL_QUERY_CACHE", "").lower() in ("1", "true", "yes")
+    )
     
     # Run evaluation (you can test multiple search types)
     search_types = ["Global Search"]  # Start with Global Search
@@ -337,9 +818,9 @@ async def main():
         evaluator.print_summary(results)
         
         # Save results
-        filepath = evaluator.save_results(results)
+        evaluator.save_results(results)
         
-        print(f"\nEvaluation complete! Check {filepath} for detailed results.")
+        print(f"\nEvaluation complete! Check {results['results_file']} for detailed results.")
         
     except KeyboardInterrupt:
         print("\nEvaluation interrupted by user.")
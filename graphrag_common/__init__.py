@@ -0,0 +1 @@
+"""Helpers shared by the Django chat app, the Gradio UI and the evaluation scripts."""
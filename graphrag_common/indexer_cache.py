@@ -0,0 +1,79 @@
+"""
+Memoization of graphrag's query-time indexer adapters.
+
+Every graphrag.api search converts the index dataframes it is given into lists of
+graphrag model objects. Callers that pass the same dataframes on every search can
+install this cache once so the conversion runs once per frame instead of per query.
+"""
+
+import functools
+import importlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# graphrag.api.query adapters that turn index dataframes into lists of model objects
+INDEXER_ADAPTERS = [
+    "read_indexer_entities", "read_indexer_communities", "read_indexer_reports",
+    "read_indexer_text_units", "read_indexer_relationships", "read_indexer_covariates"
+]
+
+# Distinct argument combinations kept per adapter before its cache is cleared
+MAX_ENTRIES = 32
+
+def frame_memoized(func):
+    """
+    Wrap an indexer adapter so calls with the same dataframe objects (and other
+    arguments) reuse the converted result instead of rebuilding it per query.
+    Unhashable arguments such as dataframes and config objects are keyed by identity.
+    """
+    cache = {}
+    
+    def key_of(value):
+        try:
+            hash(value)
+        except TypeError:
+            return ('id', id(value))
+        return value
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (
+            tuple(key_of(arg) for arg in args),
+            tuple((name, key_of(kwargs[name])) for name in sorted(kwargs))
+        )
+        entry = cache.get(key)
+        if entry is None:
+            if len(cache) >= MAX_ENTRIES:
+                cache.clear()
+            # Keep the arguments alive with the result so their ids can't be reused
+            entry = cache[key] = (func(*args, **kwargs), args, kwargs)
+        return entry[0]
+    
+    wrapper._frame_memoized = True
+    return wrapper
+
+def install_adapter_cache() -> None:
+    """Memoize graphrag's per-query dataframe conversions (safe to call repeatedly)."""
+    try:
+        query_module = importlib.import_module("graphrag.api.query")
+    except ImportError:
+        logger.warning("graphrag.api.query not found; indexer adapter cache disabled")
+        return
+    
+    wrapped = []
+    found = False
+    for name in INDEXER_ADAPTERS:
+        func = getattr(query_module, name, None)
+        if func is None:
+            continue
+        found = True
+        if getattr(func, '_frame_memoized', False):
+            continue
+        setattr(query_module, name, frame_memoized(func))
+        wrapped.append(name)
+    
+    if wrapped:
+        logger.info(f"Caching graphrag indexer adapters: {', '.join(wrapped)}")
+    elif not found:
+        logger.warning("No graphrag indexer adapters found; indexer adapter cache disabled")
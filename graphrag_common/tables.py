@@ -0,0 +1,37 @@
+"""Which GraphRAG index tables and columns the search API needs, and how to load them."""
+
+# GraphRAG output tables passed to the search API
+PARQUET_TABLES = ["entities", "communities", "community_reports", "text_units", "relationships"]
+
+# Columns graphrag's query-time adapters read from each table; anything else
+# (layout coordinates, raw report JSON, etc.) is never decoded. Columns missing
+# from older/newer index outputs are skipped rather than treated as errors
+REQUIRED_COLS = {
+    "entities": [
+        "id", "human_readable_id", "title", "type", "description",
+        "text_unit_ids", "degree", "rank", "description_embedding"
+    ],
+    "communities": [
+        "id", "human_readable_id", "community", "level", "parent", "children", "title",
+        "entity_ids", "relationship_ids", "text_unit_ids", "period", "size"
+    ],
+    "community_reports": [
+        "id", "human_readable_id", "community", "level", "parent", "children", "title",
+        "summary", "full_content", "rank", "findings", "period", "size",
+        "full_content_embedding"
+    ],
+    "text_units": [
+        "id", "human_readable_id", "text", "n_tokens", "document_ids",
+        "entity_ids", "relationship_ids", "covariate_ids"
+    ],
+    "relationships": [
+        "id", "human_readable_id", "source", "target", "description", "weight",
+        "combined_degree", "rank", "text_unit_ids"
+    ],
+}
+
+# Low-cardinality string columns loaded as pandas categoricals. Only columns graphrag
+# reads as plain strings are listed; level/community are compared numerically downstream
+LOW_CARD_COLS = {
+    "entities": ["type"],
+}
@@ -1,19 +1,33 @@
-import gradio as gr
-# Lazy import GraphRAG to improve startup time
-# import graphrag.api as api  # Commented out - will import later
+# Heavy modules (gradio, pandas, pyarrow, dotenv, graphrag) are imported inside the
+# functions that use them to improve startup time
 from pathlib import Path
-import pandas as pd
-from typing import Tuple, Dict, Any, Union
+import hashlib
+from typing import AsyncIterator, NamedTuple, Tuple, Dict, Any, List, Union, TYPE_CHECKING
 import os
-from dotenv import load_dotenv
-from graphrag.config.load_config import load_config
 import asyncio
 from functools import partial
+from collections import OrderedDict
 import time
-import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 import sys
 import logging
 import re
+import json
+import inspect
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# The repository root holds graphrag_common, shared with the Django app and evaluation
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from graphrag_common.tables import PARQUET_TABLES, REQUIRED_COLS, LOW_CARD_COLS
+
+if TYPE_CHECKING:
+    import gradio as gr
+    import pandas as pd
 
 # Set up logging
 logging.basicConfig(
@@ -29,21 +43,19 @@ logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("openai").setLevel(logging.WARNING)
 logging.getLogger("matplotlib").setLevel(logging.WARNING)
 
-# Load environment variables
-load_dotenv()
-
-# Verify API key
-if not os.getenv("GRAPHRAG_API_KEY"):
-    logger.error("GRAPHRAG_API_KEY not found in environment variables")
-    raise ValueError("GRAPHRAG_API_KEY not found. Please set it in your .env file")
-
 # Global variable to hold the GraphRAG API module
 api = None
+# Held while importing so the startup warm-up and a first search don't both report loading
+_api_lock = threading.Lock()
 
 def load_graphrag_api():
     """Lazy load GraphRAG API with progress indication."""
     global api
-    if api is None:
+    if api is not None:
+        return api
+    with _api_lock:
+        if api is not None:
+            return api
         print("🔄 Loading GraphRAG API (this may take 30-90 seconds)...")
         print("   Loading dependencies: gensim, graspologic, and other ML libraries...")
         logger.info("Loading GraphRAG API...")
@@ -59,80 +71,237 @@ def load_graphrag_api():
 # Get absolute path to project directory
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_DIRECTORY = os.path.abspath(os.path.join(SCRIPT_DIR, "..", "my_graphrag_project"))
-logger.info(f"Using project directory: {PROJECT_DIRECTORY}")
 
 COMMUNITY_LEVEL = 2
 RESPONSE_TYPE = "Multiple Paragraphs"  # Changed for better formatting
 CLAIM_EXTRACTION_ENABLED = False
 
+# The tables each search type needs. Basic Search only needs text units, so the
+# rest are loaded on the first Global/Local search
+STARTUP_TABLES = ["text_units"]
+SEARCH_TABLES = {
+    "Global Search": ["entities", "communities", "community_reports"],
+    "Local Search": ["entities", "communities", "community_reports", "text_units", "relationships"],
+    "Basic Search": ["text_units"],
+}
+
+# Uncompressed Arrow copies of the parquet outputs, reused while the parquet files are unchanged
+CACHE_DIR = Path(PROJECT_DIRECTORY) / ".cache"
+
+# Timeout for loading the startup tables
+DATA_LOAD_TIMEOUT = 30
+
 # Add timeout for searches
 SEARCH_TIMEOUT = 120  # 120 seconds timeout (first searches can be slow)
 
+# Contexts longer than this (in characters) are shown truncated and unformatted
+CONTEXT_DISPLAY_MAX = 1_000_000
+
+# Worker threads for blocking work done on behalf of searches (API import, table loads)
+BLOCKING_WORKERS = min(8, os.cpu_count() or 4)
+
+# Number of recent search results kept in memory
+SEARCH_CACHE_SIZE = 128
+
 # Model configuration
+class ModelInfo(NamedTuple):
+    """Display name, description and per-1K-token costs (USD) of a selectable model."""
+    name: str
+    description: str
+    input_cost: float
+    output_cost: float
+
 MODELS = {
-    "gpt-4-turbo-preview": {
-        "name": "GPT-4 Turbo",
-        "description": "Best quality, highest cost",
-        "input_cost": 0.01,
-        "output_cost": 0.03
-    },
-    "gpt-4": {
-        "name": "GPT-4",
-        "description": "High quality, high cost",
-        "input_cost": 0.03,
-        "output_cost": 0.06
-    },
-    "gpt-3.5-turbo-1106": {
-        "name": "GPT-3.5 Turbo",
-        "description": "Good quality, lower cost",
-        "input_cost": 0.001,
-        "output_cost": 0.002
-    }
+    "gpt-4-turbo-preview": ModelInfo("GPT-4 Turbo", "Best quality, highest cost", 0.01, 0.03),
+    "gpt-4": ModelInfo("GPT-4", "High quality, high cost", 0.03, 0.06),
+    "gpt-3.5-turbo-1106": ModelInfo("GPT-3.5 Turbo", "Good quality, lower cost", 0.001, 0.002),
 }
 
 # Default model selections
 DEFAULT_SEARCH_MODEL = "gpt-3.5-turbo-1106"  # Cheaper model for queries
 DEFAULT_GRAPH_MODEL = "gpt-4-turbo-preview"   # Better model for graph construction
 
+# Static interface text, built once
+SEARCH_TYPES = ["Global Search", "Local Search", "Basic Search"]
+MODEL_DESCRIPTIONS = "\n".join(f"- {info.name} - {info.description}" for info in MODELS.values())
+INTERFACE_DESCRIPTION = f"""Ask questions about your documents using different search strategies:
+        
+- **Global Search**: Best for general questions about overall topics and themes
+- **Local Search**: Best for finding specific information in particular sections  
+- **Basic Search**: Best for finding exact text matches
+
+**Available Models:**
+{MODEL_DESCRIPTIONS}
+
+**⚠️ Search Times:** 
+- First search: 30-90 seconds (GraphRAG API loading + processing)
+- Subsequent searches: 15-60 seconds depending on complexity
+- Searches timeout after 2 minutes
+
+**Tips for Better Results:**
+- Be specific with your questions
+- Use different search types for different kinds of information
+- Try rephrasing if you don't get the expected results"""
+
+# Patterns used by format_response, compiled once
+_BULLET_RE = re.compile(r'^[•·\-\*]\s+', re.MULTILINE)
+_BLANKS_RE = re.compile(r'\n\n+')
+_TERMS_RE = re.compile(r'\b(Cost Rental|Housing Agency|Local Authority|Dublin|Ireland)\b')
+# A sentence runs up to terminal punctuation followed by whitespace (so "3.5" and "e.g.x"
+# don't split), keeping that whitespace; trailing text without punctuation is its own sentence
+_SENTENCE_RE = re.compile(r'.*?[.!?]+(?:\s+|$)|.+$', re.DOTALL)
+
 class SearchTimeout(Exception):
     """Custom exception for search timeouts."""
     pass
 
-def signal_handler(signum, frame):
-    """Handle timeout signal."""
-    raise SearchTimeout("Search operation timed out")
+def _to_pandas(table, categories=()) -> "pd.DataFrame":
+    """
+    Convert an Arrow table to pandas. String columns without nulls stay Arrow-backed
+    (string[pyarrow]) instead of becoming Python object arrays; columns with nulls keep
+    the numpy conversion because graphrag's adapters expect None, not pd.NA, for
+    missing values.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    
+    arrow_cols = [
+        field.name for field, column in zip(table.schema, table.columns)
+        if (pa.types.is_string(field.type) or pa.types.is_large_string(field.type))
+        and column.null_count == 0 and field.name not in categories
+    ]
+    other_cols = [name for name in table.column_names if name not in arrow_cols]
+    
+    df = table.select(other_cols).to_pandas(categories=list(categories), split_blocks=True)
+    if arrow_cols:
+        strings = table.select(arrow_cols).to_pandas(
+            types_mapper=lambda arrow_type: pd.StringDtype("pyarrow")
+        )
+        df = pd.concat([df, strings], axis=1)[table.column_names]
+    return df
+
+def _read_table(name: str) -> "pd.DataFrame":
+    """
+    Read one GraphRAG output table, preferring a feather cache keyed on the parquet
+    file's mtime and size. On a miss the parquet is decoded and the cache rewritten.
+    """
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    
+    path = Path(PROJECT_DIRECTORY) / "output" / f"{name}.parquet"
+    stat = path.stat()
+    # Project onto the columns search uses (older graphrag outputs may lack some)
+    available = set(pq.read_schema(path).names)
+    columns = [col for col in REQUIRED_COLS[name] if col in available]
+    key = hashlib.sha1(
+        f"{path}:{stat.st_mtime_ns}:{stat.st_size}:{','.join(columns)}".encode()
+    ).hexdigest()[:16]
+    cache_path = CACHE_DIR / f"{name}-{key}.feather"
+    
+    if cache_path.exists():
+        try:
+            return _to_pandas(feather.read_table(cache_path, memory_map=True))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache {cache_path.name}: {e}")
+    
+    # Categoricals are built straight from Arrow and kept as dictionaries in the cache
+    categories = [col for col in LOW_CARD_COLS.get(name, []) if col in columns]
+    df = _to_pandas(
+        pq.read_table(path, columns=columns, memory_map=True, use_threads=True, pre_buffer=True),
+        categories
+    )
+    
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Drop caches of older versions of this table before writing the new one
+        for stale in CACHE_DIR.glob(f"{name}-*.feather"):
+            stale.unlink()
+        df.reset_index(drop=True).to_feather(cache_path, compression="uncompressed")
+    except Exception as e:
+        logger.warning(f"Could not write cache for {name}: {e}")
+    
+    return df
+
+def recompress_outputs() -> None:
+    """
+    Rewrite GraphRAG's parquet outputs with ZSTD level 3, dictionary encoding and column
+    statistics, which are smaller than the indexer's Snappy files and as fast to read.
+    Files already rewritten (tracked by mtime in the cache directory) are skipped, so
+    this is cheap to run on every startup.
+    """
+    import pyarrow.parquet as pq
+    
+    marker = CACHE_DIR / "recompressed.json"
+    try:
+        done = json.loads(marker.read_text())
+    except (OSError, ValueError):
+        done = {}
+    
+    for name in PARQUET_TABLES:
+        path = Path(PROJECT_DIRECTORY) / "output" / f"{name}.parquet"
+        if not path.exists() or done.get(name) == path.stat().st_mtime_ns:
+            continue
+        logger.info(f"Recompressing {path.name} with zstd...")
+        table = pq.read_table(path, memory_map=True)
+        tmp_path = path.with_suffix(".parquet.tmp")
+        pq.write_table(
+            table, tmp_path,
+            compression="zstd", compression_level=3, use_dictionary=True,
+            data_page_size=1 << 20, write_statistics=True
+        )
+        # Swap in atomically so a crash never leaves a half-written output
+        os.replace(tmp_path, path)
+        done[name] = path.stat().st_mtime_ns
+    
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    marker.write_text(json.dumps(done))
+
+def _read_tables(names, timeout: float = None) -> Dict[str, "pd.DataFrame"]:
+    """
+    Read several tables in parallel (pyarrow releases the GIL while decoding).
+    Raises SearchTimeout if they haven't all loaded within `timeout` seconds.
+    """
+    executor = ThreadPoolExecutor(max_workers=max(len(names), 1))
+    try:
+        futures = {name: executor.submit(_read_table, name) for name in names}
+        _, pending = wait(futures.values(), timeout=timeout)
+        if pending:
+            raise SearchTimeout(f"Loading tables took longer than {timeout} seconds")
+        return {name: future.result() for name, future in futures.items()}
+    finally:
+        # Don't block on reads that are still running after a timeout
+        executor.shutdown(wait=False, cancel_futures=True)
+
+# Serialises the on-demand loads so concurrent first searches read each table once
+_tables_lock = threading.Lock()
+
+def ensure_tables(data: Dict[str, Any], search_type: str) -> None:
+    """Load any tables the search type needs that were deferred at startup."""
+    needed = SEARCH_TABLES.get(search_type, PARQUET_TABLES)
+    if all(name in data for name in needed):
+        return
+    with _tables_lock:
+        missing = [name for name in needed if name not in data]
+        if missing:
+            logger.info(f"Loading {', '.join(missing)} for {search_type}...")
+            data.update(_read_tables(missing))
 
 def load_graphrag_data():
     """Load all necessary GraphRAG data."""
     try:
         # Load configuration silently
+        from graphrag.config.load_config import load_config
         config = load_config(Path(PROJECT_DIRECTORY))
         
         # Update model configuration in config
         if hasattr(config, 'models') and 'default_chat_model' in config.models:
             config.models['default_chat_model'].model = DEFAULT_SEARCH_MODEL
         
-        # Load data with timeout protection
-        signal.signal(signal.SIGALRM, signal_handler)
-        signal.alarm(30)  # 30 second timeout for data loading
-        
-        # Load parquet files silently
-        entities = pd.read_parquet(f"{PROJECT_DIRECTORY}/output/entities.parquet")
-        communities = pd.read_parquet(f"{PROJECT_DIRECTORY}/output/communities.parquet")
-        community_reports = pd.read_parquet(f"{PROJECT_DIRECTORY}/output/community_reports.parquet")
-        text_units = pd.read_parquet(f"{PROJECT_DIRECTORY}/output/text_units.parquet")
-        relationships = pd.read_parquet(f"{PROJECT_DIRECTORY}/output/relationships.parquet")
-        
-        signal.alarm(0)  # Disable alarm
+        # Load the startup tables in parallel with timeout protection, from the feather
+        # cache when it is current; the rest wait for the first search that needs them
+        tables = _read_tables(STARTUP_TABLES, timeout=DATA_LOAD_TIMEOUT)
         
-        return {
-            "config": config,
-            "entities": entities,
-            "communities": communities,
-            "community_reports": community_reports,
-            "text_units": text_units,
-            "relationships": relationships
-        }
+        return {"config": config, **tables}
     except SearchTimeout:
         logger.error("Data loading timed out. Check if files are accessible.")
         sys.exit(1)
@@ -140,18 +309,91 @@ def load_graphrag_data():
         logger.error(f"Error loading data: {str(e)}", exc_info=True)
         sys.exit(1)
 
+# Bounded pool for blocking calls from async code, so that work doesn't compete with
+# Gradio's own use of the event loop's default executor
+_blocking_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="graphrag-ui")
+
+async def run_blocking(func, *args):
+    """Run a blocking function on the shared bounded pool and await its result."""
+    return await asyncio.get_running_loop().run_in_executor(_blocking_executor, partial(func, *args))
+
+# LRU of (response, context) for successful searches, keyed by _cache_key
+_search_cache: "OrderedDict[Tuple[str, str, str], Tuple[str, str]]" = OrderedDict()
+
+def _cache_key(query: str, search_type: str, model: str) -> Tuple[str, str, str]:
+    """Normalise whitespace and case so trivially different queries share an entry."""
+    return (" ".join(query.split()).lower(), search_type, model)
+
+def _is_failed_response(response: str) -> bool:
+    """True for the timeout/error messages search returns in place of an answer."""
+    return not response or response.startswith(("Error:", "⏰"))
+
+def get_cached_search(key: Tuple[str, str, str]) -> Union[Tuple[str, str], None]:
+    """Return a cached search result and mark it most recently used."""
+    result = _search_cache.get(key)
+    if result is not None:
+        _search_cache.move_to_end(key)
+    return result
+
+def cache_search(key: Tuple[str, str, str], result: Tuple[str, str]) -> None:
+    """Store a search result, evicting the least recently used entry when full."""
+    _search_cache[key] = result
+    _search_cache.move_to_end(key)
+    if len(_search_cache) > SEARCH_CACHE_SIZE:
+        _search_cache.popitem(last=False)
+
+# Searches currently running, keyed by _cache_key, so identical concurrent requests share one
+_inflight_searches: Dict[Tuple[str, str, str], "asyncio.Task"] = {}
+
+async def _search_and_cache(key: Tuple[str, str, str], query: str, search_type: str,
+                            model: str, data: Dict[str, Any]) -> Tuple[str, str]:
+    """Run a search and cache the result if it succeeded."""
+    response, context = await search(query, search_type, model, data)
+    if not _is_failed_response(response):
+        cache_search(key, (response, context))
+    return response, context
+
+async def search_single_flight(query: str, search_type: str, model: str,
+                               data: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Return a cached result, join an identical search that is already running, or
+    start a new one. The shared search is shielded so one caller timing out doesn't
+    cancel it for the others.
+    """
+    key = _cache_key(query, search_type, model)
+    cached = get_cached_search(key)
+    if cached is not None:
+        logger.info("Serving search result from cache")
+        return cached
+    
+    task = _inflight_searches.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_search_and_cache(key, query, search_type, model, data))
+        _inflight_searches[key] = task
+        
+        def _forget(done: "asyncio.Task") -> None:
+            if _inflight_searches.get(key) is done:
+                del _inflight_searches[key]
+        task.add_done_callback(_forget)
+    else:
+        logger.info("Joining identical search already in progress")
+    
+    return await asyncio.shield(task)
+
 async def search_with_timeout(search_func, **kwargs) -> Tuple[str, str]:
     """Wrapper to add timeout to search functions."""
     try:
         # Log the function being called and its parameters
         logger.debug(f"Calling {search_func.__name__} with params: {kwargs}")
         
-        # Create a task for the search
-        search_task = asyncio.create_task(search_func(**kwargs))
         start_time = time.time()
         
-        # Wait for the task with timeout
-        response, context = await asyncio.wait_for(search_task, timeout=SEARCH_TIMEOUT)
+        # Await the search in the current task with a deadline (no extra wrapper task)
+        if hasattr(asyncio, "timeout"):
+            async with asyncio.timeout(SEARCH_TIMEOUT):
+                response, context = await search_func(**kwargs)
+        else:  # Python 3.10
+            response, context = await asyncio.wait_for(search_func(**kwargs), timeout=SEARCH_TIMEOUT)
         
         # Log completion time
         duration = time.time() - start_time
@@ -165,61 +407,133 @@ async def search_with_timeout(search_func, **kwargs) -> Tuple[str, str]:
         logger.error(f"Search error: {str(e)}", exc_info=True)
         return f"Error: {str(e)}", ""
 
+async def _prepare_search(search_type: str, model: str, data: Dict[str, Any]):
+    """Make sure the API and the search type's tables are loaded, set the model, return the API."""
+    # Load GraphRAG API if not already loaded (off the event loop, it can take a while)
+    api_module = await run_blocking(load_graphrag_api)
+    
+    # Read any tables this search type needs that weren't loaded at startup
+    await run_blocking(ensure_tables, data, search_type)
+    
+    # Update model in config
+    if hasattr(data["config"], 'llm_config'):
+        logger.debug(f"Updating model in config to {model}")
+        data["config"].llm_config.model = model
+    
+    return api_module
+
+def _search_request(query: str, search_type: str, data: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Return the graphrag.api function name and its arguments for a search type."""
+    search_params = {
+        "config": data["config"],
+        "query": query
+    }
+
+    if search_type == "Global Search":
+        logger.debug("Preparing Global Search parameters")
+        search_params.update({
+            "entities": data["entities"],
+            "communities": data["communities"],
+            "community_reports": data["community_reports"],
+            "community_level": COMMUNITY_LEVEL,
+            "dynamic_community_selection": False,
+            "response_type": RESPONSE_TYPE
+        })
+        return "global_search", search_params
+        
+    elif search_type == "Local Search":
+        logger.debug("Preparing Local Search parameters")
+        search_params.update({
+            "entities": data["entities"],
+            "communities": data["communities"],
+            "community_reports": data["community_reports"],
+            "text_units": data["text_units"],
+            "relationships": data["relationships"],
+            "covariates": None,
+            "community_level": COMMUNITY_LEVEL,
+            "response_type": RESPONSE_TYPE
+        })
+        return "local_search", search_params
+        
+    else:  # Basic Search
+        logger.debug("Preparing Basic Search parameters")
+        search_params.update({
+            "text_units": data["text_units"]
+        })
+        return "basic_search", search_params
+
 async def search(query: str, search_type: str, model: str, data: Dict[str, Any]) -> Tuple[str, str]:
     """Perform search based on selected type."""
     try:
         logger.info(f"Starting {search_type} with model {model}")
-        
-        # Load GraphRAG API if not already loaded
-        api_module = load_graphrag_api()
-        
-        # Update model in config
-        if hasattr(data["config"], 'llm_config'):
-            logger.debug(f"Updating model in config to {model}")
-            data["config"].llm_config.model = model
-        
-        search_params = {
-            "config": data["config"],
-            "query": query
-        }
-
-        if search_type == "Global Search":
-            logger.debug("Preparing Global Search parameters")
-            search_params.update({
-                "entities": data["entities"],
-                "communities": data["communities"],
-                "community_reports": data["community_reports"],
-                "community_level": COMMUNITY_LEVEL,
-                "dynamic_community_selection": False,
-                "response_type": RESPONSE_TYPE
-            })
-            return await search_with_timeout(api_module.global_search, **search_params)
-            
-        elif search_type == "Local Search":
-            logger.debug("Preparing Local Search parameters")
-            search_params.update({
-                "entities": data["entities"],
-                "communities": data["communities"],
-                "community_reports": data["community_reports"],
-                "text_units": data["text_units"],
-                "relationships": data["relationships"],
-                "covariates": None,
-                "community_level": COMMUNITY_LEVEL,
-                "response_type": RESPONSE_TYPE
-            })
-            return await search_with_timeout(api_module.local_search, **search_params)
-            
-        else:  # Basic Search
-            logger.debug("Preparing Basic Search parameters")
-            search_params.update({
-                "text_units": data["text_units"]
-            })
-            return await search_with_timeout(api_module.basic_search, **search_params)
-            
+        api_module = await _prepare_search(search_type, model, data)
+        func_name, search_params = _search_request(query, search_type, data)
+        return await search_with_timeout(getattr(api_module, func_name), **search_params)
     except Exception as e:
         logger.error(f"Error in search: {str(e)}", exc_info=True)
         return f"Error: {str(e)}", ""
 
+def _context_callbacks(on_context) -> Any:
+    """
+    Return graphrag query callbacks that report the search context to `on_context`,
+    the same way graphrag's non-streaming search functions collect it. None when the
+    installed graphrag has no query callbacks.
+    """
+    try:
+        from graphrag.callbacks.noop_query_callbacks import NoopQueryCallbacks
+    except ImportError:
+        return None
+    callbacks = NoopQueryCallbacks()
+    callbacks.on_context = on_context
+    return callbacks
+
+async def search_stream(query: str, search_type: str, model: str,
+                        data: Dict[str, Any]) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Yield (answer so far, "") as GraphRAG streams the answer, then (answer, context)
+    once it is complete. Falls back to a single yield of the full result when the
+    installed graphrag can't stream the search type with its context. Only complete
+    results with context are cached, like regular searches.
+    """
+    key = _cache_key(query, search_type, model)
+    cached = get_cached_search(key)
+    if cached is not None:
+        logger.info("Serving search result from cache")
+        yield cached
+        return
+    
+    logger.info(f"Starting streaming {search_type} with model {model}")
+    api_module = await _prepare_search(search_type, model, data)
+    func_name, search_params = _search_request(query, search_type, data)
+    stream_func = getattr(api_module, f"{func_name}_streaming", None)
+    contexts = []
+    callbacks = _context_callbacks(contexts.append) if stream_func is not None else None
+    if callbacks is None or "callbacks" not in inspect.signature(stream_func).parameters:
+        yield await search_single_flight(query, search_type, model, data)
+        return
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + SEARCH_TIMEOUT
+    chunks = []
+    stream = stream_func(**search_params, callbacks=[callbacks])
+    try:
+        while True:
+            try:
+                chunk = await asyncio.wait_for(stream.__anext__(), timeout=deadline - loop.time())
+            except StopAsyncIteration:
+                break
+            chunks.append(chunk)
+            yield "".join(chunks), ""
+    finally:
+        await stream.aclose()
+    
+    response = "".join(chunks)
+    context = str(contexts[-1]) if contexts else ""
+    yield response, context
+    # A result without context would hide the context panel on every later cache hit
+    if context and not _is_failed_response(response):
+        cache_search(key, (response, context))
+
 def format_response(response: str) -> str:
     """Format the response text for better readability."""
     if not response:
@@ -229,89 +543,96 @@ def format_response(response: str) -> str:
     formatted = response.strip()
     
     # Convert bullet points to markdown format
-    formatted = re.sub(r'^[•·\-\*]\s+', '- ', formatted, flags=re.MULTILINE)
+    formatted = _BULLET_RE.sub('- ', formatted)
     
     # Add proper spacing around sections
-    formatted = re.sub(r'\n\n+', '\n\n', formatted)
+    formatted = _BLANKS_RE.sub('\n\n', formatted)
     
     # Bold key terms (entities that might be important)
     # This is a simple heuristic - you might want to make this more sophisticated
-    formatted = re.sub(r'\b(Cost Rental|Housing Agency|Local Authority|Dublin|Ireland)\b', 
-                      r'**\1**', formatted)
+    formatted = _TERMS_RE.sub(r'**\1**', formatted)
     
     # Add line breaks for better readability
-    sentences = formatted.split('. ')
+    sentences = _SENTENCE_RE.findall(formatted)
     if len(sentences) > 3:
-        # Group sentences into paragraphs
-        paragraphs = []
-        current_paragraph = []
-        for sentence in sentences:
-            current_paragraph.append(sentence)
-            if len(current_paragraph) >= 3:  # 3 sentences per paragraph
-                paragraphs.append('. '.join(current_paragraph) + '.')
-                current_paragraph = []
-        if current_paragraph:
-            paragraphs.append('. '.join(current_paragraph))
-        formatted = '\n\n'.join(paragraphs)
+        formatted = '\n\n'.join(_paragraphs(sentences))
     
     return formatted
 
+def _paragraphs(sentences, per: int = 3):
+    """Group sentences into paragraphs of `per` sentences, yielding each as it fills."""
+    current = []
+    for sentence in sentences:
+        current.append(sentence)
+        if len(current) == per:
+            yield ''.join(current).rstrip()
+            current = []
+    if current:
+        yield ''.join(current).rstrip()
+
 def format_context_data(context_data: str) -> str:
     """Format context data for display."""
     if not context_data or context_data == "":
         return "No context data available"
     
-    # Try to parse and format structured data
-    try:
-        # If it's a string representation of a list/dict, format it
-        if context_data.startswith('[') or context_data.startswith('{'):
-            import json
-            parsed = json.loads(context_data)
-            return f"```json\n{json.dumps(parsed, indent=2)}\n```"
-    except:
-        pass
+    # Huge contexts aren't worth parsing or pretty-printing; the Markdown widget can't
+    # render them usefully anyway
+    if len(context_data) > CONTEXT_DISPLAY_MAX:
+        return f"```\n{context_data[:CONTEXT_DISPLAY_MAX]}\n... (truncated)\n```"
+    
+    # If it's a JSON list/dict, pretty-print it
+    head = context_data.lstrip()[:1]
+    if head in ('[', '{'):
+        try:
+            if orjson is not None:
+                pretty = orjson.dumps(orjson.loads(context_data), option=orjson.OPT_INDENT_2).decode()
+            else:
+                pretty = json.dumps(json.loads(context_data), indent=2)
+            return f"```json\n{pretty}\n```"
+        except ValueError:
+            # Not JSON (e.g. a Python repr); fall through to the raw text
+            pass
     
     # Otherwise, just return the raw context
     return f"```\n{context_data}\n```"
 
-def create_interface(data: Dict[str, Any], loop: asyncio.AbstractEventLoop) -> gr.Interface:
+def create_interface(data: Dict[str, Any]) -> "gr.Interface":
     """Create the Gradio interface."""
-    search_types = ["Global Search", "Local Search", "Basic Search"]
+    import gradio as gr
+    
     model_choices = list(MODELS.keys())
     
-    def sync_search(query: str, search_type: str, model: str) -> Tuple[str, str]:
-        """Synchronous wrapper that uses the provided event loop."""
+    async def stream_search(query: str, search_type: str, model: str) -> AsyncIterator[Tuple[str, str]]:
+        """Stream a search's answer to the interface, then show the formatted result."""
+        response, context = "", ""
         try:
-            if not loop.is_running():
-                logger.error("Event loop not running")
-                return "Error: Server configuration issue. Please try again.", ""
-            
             logger.info(f"Processing search request: {search_type}, Query: {query}, Model: {model}")
-            future = asyncio.run_coroutine_threadsafe(
-                search(query, search_type, model, data),
-                loop
-            )
             
-            # Use longer timeout for the sync wrapper
-            response, context = future.result(timeout=SEARCH_TIMEOUT + 10)
+            # Partial answers are shown as they arrive; formatting runs once at the end
+            async for response, context in search_stream(query, search_type, model, data):
+                yield response, ""
             
-            # Format the response for better display
-            formatted_response = format_response(response)
-            formatted_context = format_context_data(context)
-            
-            return formatted_response, formatted_context
+            yield format_response(response), format_context_data(context)
         except asyncio.TimeoutError:
-            logger.error(f"Search request timed out after {SEARCH_TIMEOUT + 10} seconds")
-            return f"⏰ **Search Timeout**: Your search took longer than {SEARCH_TIMEOUT} seconds and was cancelled.\n\n**Try these solutions:**\n- Make your question more specific\n- Try a different search type\n- Check your internet connection\n- The GraphRAG system might be under heavy load", ""
+            logger.error(f"Search request timed out after {SEARCH_TIMEOUT} seconds")
+            yield f"⏰ **Search Timeout**: Your search took longer than {SEARCH_TIMEOUT} seconds and was cancelled.\n\n**Try these solutions:**\n- Make your question more specific\n- Try a different search type\n- Check your internet connection\n- The GraphRAG system might be under heavy load", ""
         except Exception as e:
-            logger.error(f"Error in sync_search: {str(e)}", exc_info=True)
-            return f"❌ **Search Error**: {str(e)}\n\nPlease try again or contact support if the issue persists.", ""
+            logger.error(f"Error in stream_search: {str(e)}", exc_info=True)
+            yield f"❌ **Search Error**: {str(e)}\n\nPlease try again or contact support if the issue persists.", ""
     
-    # Create model choice descriptions
-    model_descriptions = [f"{MODELS[m]['name']} - {MODELS[m]['description']}" for m in model_choices]
+    async def batch_search(queries: List[str], search_types: List[str],
+                           models: List[str]) -> Tuple[List[str], List[str]]:
+        """Answer a batch of queued API requests concurrently, without streaming."""
+        results = await asyncio.gather(*(
+            search_single_flight(query, search_type, model, data)
+            for query, search_type, model in zip(queries, search_types, models)
+        ))
+        responses = [format_response(response) for response, _ in results]
+        contexts = [format_context_data(context) for _, context in results]
+        return responses, contexts
     
     interface = gr.Interface(
-        fn=sync_search,
+        fn=stream_search,
         inputs=[
             gr.Textbox(
                 label="Enter your question",
@@ -319,7 +640,7 @@ def create_interface(data: Dict[str, Any], loop: asyncio.AbstractEventLoop) -> g
                 info="Try to be as specific as possible with your question"
             ),
             gr.Dropdown(
-                choices=search_types,
+                choices=SEARCH_TYPES,
                 label="Search Type",
                 value="Global Search",
                 info="Global: Overall knowledge, Local: Specific sections, Basic: Exact matches"
@@ -336,24 +657,7 @@ def create_interface(data: Dict[str, Any], loop: asyncio.AbstractEventLoop) -> g
             gr.Markdown(label="Context Information", visible=True)
         ],
         title="Document Search Interface",
-        description=f"""Ask questions about your documents using different search strategies:
-        
-- **Global Search**: Best for general questions about overall topics and themes
-- **Local Search**: Best for finding specific information in particular sections  
-- **Basic Search**: Best for finding exact text matches
-
-**Available Models:**
-{chr(10).join(f'- {desc}' for desc in model_descriptions)}
-
-**⚠️ Search Times:** 
-- First search: 30-90 seconds (GraphRAG API loading + processing)
-- Subsequent searches: 15-60 seconds depending on complexity
-- Searches timeout after 2 minutes
-
-**Tips for Better Results:**
-- Be specific with your questions
-- Use different search types for different kinds of information
-- Try rephrasing if you don't get the expected results""",
+        description=INTERFACE_DESCRIPTION,
         examples=[
             ["What are the main housing schemes available in Ireland?", "Global Search", DEFAULT_SEARCH_MODEL],
             ["What are the income limits for Cost Rental homes?", "Local Search", DEFAULT_SEARCH_MODEL],
@@ -361,51 +665,60 @@ def create_interface(data: Dict[str, Any], loop: asyncio.AbstractEventLoop) -> g
         ]
     )
     
+    # Gradio can't batch a streaming fn, so batching gets its own API endpoint where
+    # the queue hands over up to four waiting requests at once (gr.api needs Gradio 5+)
+    if hasattr(gr, "api"):
+        with interface:
+            gr.api(batch_search, api_name="batch_search", batch=True, max_batch_size=4)
+    
     return interface
 
 def main():
     """Main application entry point."""
+    from dotenv import load_dotenv
+    
+    # Load environment variables
+    load_dotenv()
+    
+    # Verify API key
+    if not os.getenv("GRAPHRAG_API_KEY"):
+        logger.error("GRAPHRAG_API_KEY not found. Please set it in your .env file")
+        sys.exit(1)
+    
+    logger.info(f"Using project directory: {PROJECT_DIRECTORY}")
+    
     try:
         print("🚀 Starting GraphRAG UI...")
         logger.info("Starting GraphRAG UI...")
         
+        # Opt-in: rewrite the indexer's outputs in a smaller encoding before loading them
+        if os.getenv("GRAPHRAG_RECOMPRESS_OUTPUTS", "").lower() in ("1", "true", "yes"):
+            recompress_outputs()
+        
         print("📂 Loading GraphRAG data...")
         # Load data silently
         data = load_graphrag_data()
         print("✅ Data loaded successfully!")
         
-        # Create and get event loop
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        # Import the GraphRAG API in the background while the web server starts, so the
+        # first search usually finds it already loaded
+        threading.Thread(target=load_graphrag_api, name="graphrag-warmup", daemon=True).start()
         
-        # Create interface with loop
-        demo = create_interface(data, loop)
-        
-        # Run the event loop in a separate thread
-        import threading
-        def run_event_loop():
-            loop.run_forever()
-            
-        loop_thread = threading.Thread(target=run_event_loop, daemon=True)
-        loop_thread.start()
+        # Gradio awaits the async search on its own event loop
+        demo = create_interface(data)
         
         print("🌐 Starting web interface...")
-        print("📝 Note: Your first search will take 30-90 seconds (API loading + processing)")
+        print("📝 Note: The GraphRAG API loads in the background; a search started before it")
+        print("     finishes (30-90 seconds) waits for it")
         print("     Searches timeout after 2 minutes if no response")
         
         # Run the Gradio interface
-        try:
-            demo.launch(
-                server_name="0.0.0.0",
-                server_port=7860,
-                share=True,
-                show_error=True
-            )
-        finally:
-            # Clean up
-            loop.call_soon_threadsafe(loop.stop)
-            loop_thread.join()
-            loop.close()
+        demo.launch(
+            server_name="0.0.0.0",
+            server_port=7860,
+            share=True,
+            show_error=True
+        )
             
     except Exception as e:
         logger.error(f"Fatal error: {str(e)}", exc_info=True)
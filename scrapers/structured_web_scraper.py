@@ -6,13 +6,16 @@ Structured Web Scraper for GraphRAG
 import os
 import re
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 from pathlib import Path
 from dotenv import load_dotenv
 import hashlib
 from bs4 import BeautifulSoup
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Union
 import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, urlparse
 
 # Try to import Firecrawl, fallback to requests if not available
@@ -23,14 +26,80 @@ except ImportError:
     print("Firecrawl not available, using requests + BeautifulSoup")
     FIRECRAWL_AVAILABLE = False
 
+# Prefer the lxml parser (C, much faster on large pages); fall back to the stdlib one
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+# Optional on-disk HTTP cache so re-runs don't download unchanged pages again
+try:
+    import requests_cache
+    REQUESTS_CACHE_AVAILABLE = True
+except ImportError:
+    REQUESTS_CACHE_AVAILABLE = False
+
 load_dotenv()
 
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+    'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.1'
+}
+# (connect, read) seconds, so a hung socket can't hold a pooled connection forever
+REQUEST_TIMEOUT = (3, 15)
+# Connections kept per host; enough for save_many_for_graphrag's worker threads
+POOL_SIZE = 50
+# Cached responses are reused for a day, then revalidated with their ETag/Last-Modified
+CACHE_PATH = Path(__file__).resolve().parent / ".scrape_cache" / "responses.sqlite"
+CACHE_EXPIRE_SECONDS = 24 * 60 * 60
+
+# Tables bigger than this are only described in text, not rendered as markdown
+MARKDOWN_MAX_ROWS = 20
+MARKDOWN_MAX_COLS = 12
+
+# Candidate titles containing any of these are just the site name or a generic page
+_UNWANTED_TITLE_TERMS = frozenset({'cookies', 'analytics', 'citizensinformation.ie', 'home'})
+_UNWANTED_TITLE_RE = re.compile('|'.join(map(re.escape, sorted(_UNWANTED_TITLE_TERMS))), re.IGNORECASE)
+
+# Elements _extract_table_context takes a table's section heading or description from
+_CONTEXT_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p']
+
+# Runs of whitespace inside table cells, collapsed to one space
+_WS_RE = re.compile(r'\s+')
+
+# Boilerplate stripped by _clean_content: cookie notices, skip links, share and
+# back-to-top buttons. One alternation so the content is scanned once; each branch
+# keeps its own flags, and the multi-line blocks come first so they win over the
+# single-line patterns that can match inside them.
+_DROP_RE = re.compile('|'.join([
+    r'(?is:### Cookies used by Google Analytics.*?Close\s*)',
+    r'(?is:## Cookies on.*?Manage my preferences\s*)',
+    r'(?is:Allow analytics cookies.*?Close\s*)',
+    r'(?s:\[Share to Facebook\].*?\[Print This Page\].*?\n)',
+    r'(?i:(?:accept all cookies|manage cookies|cookie preferences).*?\n)',
+    r'(?i:(?:skip to main content|skip navigation).*?\n)',
+    r'\[Back to top\].*?\n',
+]))
+_SCORE_LINE_RE = re.compile(r'\n\d+\.\d+\s*$', re.MULTILINE)
+_MANAGE_PREFS_RE = re.compile(r'## Manage\s*\nManage preferences\s*$', re.DOTALL)
+_BROKEN_HEADING_RE = re.compile(r'\[\s*\n#')
+_BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n')
+# Only runs of two or more; tabs are turned into spaces first with str.replace
+_SPACES_RE = re.compile(r' {2,}')
+
 class StructuredWebScraper:
     """
     Web scraper that handles both structured and unstructured data.
     """
     
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
         self.firecrawl_api_key = os.getenv("FIRECRAWL_API_KEY")
         if FIRECRAWL_AVAILABLE and self.firecrawl_api_key:
             self.firecrawl = Firecrawl()
@@ -38,18 +107,41 @@ class StructuredWebScraper:
         else:
             self.firecrawl = None
             print("📝 Using requests + BeautifulSoup")
+        
+        # One session for every fetch so connections are kept alive between pages
+        if use_cache and REQUESTS_CACHE_AVAILABLE:
+            CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            # Only HTML is cached: storing a response reads its whole body, which would
+            # defeat scrape_page skipping PDFs and images after the headers
+            self.session = requests_cache.CachedSession(
+                str(CACHE_PATH), backend='sqlite', expire_after=CACHE_EXPIRE_SECONDS,
+                filter_fn=lambda response: self._is_html(response.headers.get('Content-Type', ''))
+            )
+        else:
+            self.session = requests.Session()
+        self.session.headers.update(REQUEST_HEADERS)
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
     
-    def extract_tables_from_html(self, html_content: str, base_url: str = "") -> List[Dict[str, Any]]:
+    def extract_tables_from_html(self, html_content: Union[str, BeautifulSoup],
+                                 base_url: str = "") -> List[Dict[str, Any]]:
         """
         Extract tables as structured data with context.
+        Accepts raw HTML or an already parsed soup (to avoid parsing the page again).
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
+        if isinstance(html_content, BeautifulSoup):
+            soup = html_content
+        else:
+            soup = BeautifulSoup(html_content, HTML_PARSER)
         tables = []
+        all_tables = soup.find_all('table')
+        num_tables = len(all_tables)
         
-        for i, table in enumerate(soup.find_all('table')):
+        for i, table in enumerate(all_tables):
             try:
-                # Extract table as DataFrame
-                df = pd.read_html(str(table))[0]
+                # Extract table as DataFrame from the parsed nodes
+                df = self._table_to_dataframe(table)
                 
                 # Clean column names
                 if len(df.columns) > 0:
@@ -69,7 +161,7 @@ class StructuredWebScraper:
                     'context': context,
                     'html': str(table),
                     'shape': df.shape,
-                    'location': f"Table {i+1} of {len(soup.find_all('table'))}"
+                    'location': f"Table {i+1} of {num_tables}"
                 }
                 
                 tables.append(table_info)
@@ -80,14 +172,122 @@ class StructuredWebScraper:
         
         return tables
     
+    def _table_to_dataframe(self, table) -> pd.DataFrame:
+        """
+        Build a DataFrame from a parsed <table> without re-serialising it for pd.read_html.
+        Leading all-<th> (or <thead>) rows become the column names; colspan/rowspan
+        cells are repeated, empty cells become None and numeric columns are converted.
+        """
+        # Rows of this table only, not of tables nested inside it
+        rows = [tr for tr in table.find_all('tr') if tr.find_parent('table') is table]
+        
+        grid = []
+        header_rows = 0
+        pending = {}  # column -> (remaining rows, text) for rowspan cells
+        for tr in rows:
+            cells = tr.find_all(['th', 'td'], recursive=False)
+            row = []
+            col = 0
+            for cell in cells:
+                while col in pending:
+                    row.append(self._take_rowspan(pending, col))
+                    col += 1
+                text = _WS_RE.sub(' ', cell.get_text(' ', strip=True)) or None
+                colspan = self._span(cell, 'colspan')
+                rowspan = self._span(cell, 'rowspan')
+                for _ in range(colspan):
+                    if rowspan > 1:
+                        pending[col] = (rowspan - 1, text)
+                    row.append(text)
+                    col += 1
+            while col in pending:
+                row.append(self._take_rowspan(pending, col))
+                col += 1
+            if not row:
+                continue
+            is_header = tr.find_parent('thead') is not None or all(c.name == 'th' for c in cells)
+            if is_header and header_rows == len(grid):
+                header_rows += 1
+            grid.append(row)
+        
+        if not grid:
+            raise ValueError("No rows found in table")
+        
+        width = max(len(row) for row in grid)
+        grid = [row + [None] * (width - len(row)) for row in grid]
+        
+        if header_rows and header_rows < len(grid):
+            # Join stacked header rows per column, skipping repeats from colspans
+            columns = []
+            for parts in zip(*grid[:header_rows]):
+                words = []
+                for part in parts:
+                    if part and part not in words:
+                        words.append(part)
+                columns.append(' '.join(words) if words else len(columns))
+            body = grid[header_rows:]
+        else:
+            columns = list(range(width))
+            body = grid
+        
+        # Make duplicate column names unique the way pandas does (name, name.1, ...)
+        seen = {}
+        for i, name in enumerate(columns):
+            if name in seen:
+                seen[name] += 1
+                columns[i] = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+        
+        df = pd.DataFrame(body, columns=columns)
+        for col in df.columns:
+            values = df[col]
+            if values.isna().all():
+                continue
+            try:
+                df[col] = pd.to_numeric(values.str.replace(',', '', regex=False))
+            except (ValueError, TypeError, AttributeError):
+                pass
+        return df
+    
+    @staticmethod
+    def _span(cell, attr: str) -> int:
+        """Read a colspan/rowspan attribute, treating missing or bad values as 1."""
+        try:
+            return max(int(cell.get(attr, 1)), 1)
+        except (TypeError, ValueError):
+            return 1
+    
+    @staticmethod
+    def _take_rowspan(pending: Dict[int, Tuple[int, Any]], col: int) -> Any:
+        """Consume one row of a rowspan cell carried down into this column."""
+        remaining, text = pending[col]
+        if remaining > 1:
+            pending[col] = (remaining - 1, text)
+        else:
+            del pending[col]
+        return text
+    
     def _extract_table_context(self, table_element, soup) -> str:
         """Extract contextual information around a table."""
         context_parts = []
         
-        # Look for preceding heading
-        current = table_element.find_previous()
-        heading_distance = 0
-        while current and heading_distance < 5:
+        # Look for preceding heading among the table's previous siblings. A table
+        # wrapped on its own (e.g. a scroll div) is scanned from its wrapper instead.
+        anchor = table_element
+        while (anchor.find_previous_sibling() is None and anchor.parent is not None
+               and anchor.parent.name not in ('body', '[document]')):
+            anchor = anchor.parent
+        for sibling in anchor.find_previous_siblings(limit=5):
+            # A sibling wrapper (e.g. <div><h2>...</h2></div>) is represented by its
+            # last heading or paragraph, the one nearest the table
+            if sibling.name in _CONTEXT_TAGS:
+                current = sibling
+            else:
+                nested = sibling.find_all(_CONTEXT_TAGS)
+                if not nested:
+                    continue
+                current = nested[-1]
             if current.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
                 context_parts.append(f"Section: {current.get_text(strip=True)}")
                 break
@@ -96,8 +296,6 @@ class StructuredWebScraper:
                 if len(text) > 10:  # Meaningful paragraph
                     context_parts.append(f"Context: {text}")
                     break
-            current = current.find_previous()
-            heading_distance += 1
         
         # Look for table caption
         caption = table_element.find('caption')
@@ -136,20 +334,20 @@ class StructuredWebScraper:
             if numeric_cols:
                 summary_parts.append(f"Numeric data in: {', '.join(numeric_cols)}")
             
-            # Look for patterns in data
-            for col in df.columns:
-                if col and len(str(col)) > 0:
-                    unique_vals = df[col].nunique() if rows > 1 else 1
-                    if unique_vals <= 5 and rows > 3:  # Categorical data
+            # Look for patterns in data (categorical columns need more than 3 rows)
+            if rows > 3:
+                unique_counts = df.nunique()
+                for col in df.columns:
+                    if col and len(str(col)) > 0 and unique_counts[col] <= 5:
                         vals = df[col].unique()[:3]  # First 3 unique values
                         summary_parts.append(f"{col} categories: {', '.join(str(v) for v in vals)}")
         
         # Sample data description
         if rows > 0 and cols > 0:
             try:
-                first_row = df.iloc[0]
+                first_row = df.iloc[:1].to_numpy(dtype=object)[0]
                 sample_data = []
-                for col, val in first_row.items():
+                for col, val in zip(df.columns, first_row):
                     if pd.notna(val) and str(val).strip():
                         sample_data.append(f"{col}: {val}")
                 if sample_data:
@@ -159,20 +357,45 @@ class StructuredWebScraper:
         
         return ". ".join(summary_parts)
     
-    def _extract_page_title(self, html_content: str) -> str:
-        """Extract the page title from HTML content."""
-        soup = BeautifulSoup(html_content, 'html.parser')
+    @staticmethod
+    def _find_metadata_tags(soup: BeautifulSoup) -> Dict[str, Any]:
+        """
+        Find the <title>, first <h1> and meta description in one walk of the tree,
+        stopping as soon as all three have been seen. Keys are absent when not found.
+        """
+        found = {}
+        for node in soup.descendants:
+            name = node.name  # None for text nodes
+            if name == 'meta':
+                if 'description' not in found and node.get('name') == 'description':
+                    found['description'] = node
+            elif name in ('title', 'h1') and name not in found:
+                found[name] = node
+            else:
+                continue
+            if len(found) == 3:
+                break
+        return found
+    
+    def _extract_page_title(self, soup: BeautifulSoup,
+                            tags: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Extract the page title from parsed HTML. `tags` is the result of
+        _find_metadata_tags, when the caller already has it.
+        """
+        if tags is None:
+            tags = self._find_metadata_tags(soup)
         
         # Try multiple methods to get title
         title_candidates = []
         
         # Method 1: <title> tag
-        title_tag = soup.find('title')
+        title_tag = tags.get('title')
         if title_tag:
             title_candidates.append(title_tag.get_text(strip=True))
         
         # Method 2: h1 tag
-        h1_tag = soup.find('h1')
+        h1_tag = tags.get('h1')
         if h1_tag:
             title_candidates.append(h1_tag.get_text(strip=True))
         
@@ -182,12 +405,10 @@ class StructuredWebScraper:
         #     title_candidates.append(meta_title.get('content', ''))
         
         # Filter out common unwanted titles
-        unwanted_terms = ['cookies', 'analytics', 'citizensinformation.ie', 'home']
-        
         for title in title_candidates:
             if title and len(title) > 0:
                 # Skip if it's just website name or generic terms
-                if not any(term in title.lower() for term in unwanted_terms):
+                if not _UNWANTED_TITLE_RE.search(title):
                     return title
                 # But if it contains useful info, clean it
                 elif len(title) > 20:
@@ -237,87 +458,166 @@ class StructuredWebScraper:
             
             # Method 2: Use requests if Firecrawl unavailable or failed
             if not html_content:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-                }
-                response = requests.get(url, headers=headers)
-                response.raise_for_status()
-                html_content = response.text
-                
-                if not main_content:
-                    # Extract main content with BeautifulSoup
-                    soup = BeautifulSoup(html_content, 'html.parser')
-                    
-                    # Remove unwanted elements
-                    for elem in soup.find_all(['script', 'style', 'nav', 'footer', 'header']):
-                        elem.decompose()
-                    
-                    # Extract main content
-                    main = soup.find('main') or soup.find('article') or soup.find('body')
-                    if main:
-                        main_content = main.get_text(separator='\n', strip=True)
-                    else:
-                        main_content = soup.get_text(separator='\n', strip=True)
-            
-            # Extract tables
-            tables = self.extract_tables_from_html(html_content, url)
+                # Stream so a PDF or image is dropped after the headers, not downloaded
+                with self.session.get(url, timeout=REQUEST_TIMEOUT, stream=True) as response:
+                    response.raise_for_status()
+                    content_type = response.headers.get('Content-Type', '')
+                    if not self._is_html(content_type):
+                        print(f"Skipping {url}: not an HTML page ({content_type})")
+                        return None
+                    html_content = response.text
+                # Main content is extracted from the HTML when Firecrawl gave none
+                return self._build_page_data(url, html_content, main_content or None)
             
-            # Clean main content
-            cleaned_content = self._clean_content(main_content or "")
+            return self._build_page_data(url, html_content, main_content)
             
-            # Extract metadata
-            page_title = self._extract_page_title(html_content)
-            soup = BeautifulSoup(html_content, 'html.parser')
-            metadata = {
-                'url': url,
-                'title': page_title,
-                'description': self._get_meta_description(soup),
-                'num_tables': len(tables),
-                'content_length': len(cleaned_content)
-            }
-            
-            return {
-                'main_content': cleaned_content,
-                'tables': tables,
-                'metadata': metadata
-            }
+        except Exception as e:
+            print(f"Error scraping {url}: {e}")
+            return None
+    
+    @staticmethod
+    def _is_html(content_type: str) -> bool:
+        """Servers that send no Content-Type get the benefit of the doubt."""
+        return not content_type or 'html' in content_type.lower()
+    
+    def _build_page_data(self, url: str, html_content: str,
+                         main_content: Optional[str]) -> Dict[str, Any]:
+        """
+        Parse fetched HTML into the scrape_page result. CPU-bound, so the async scraper
+        runs it in a worker thread. `main_content` None means extract it from the HTML.
+        """
+        # Parse the page once for tables, title, description and main content
+        soup = BeautifulSoup(html_content, HTML_PARSER)
+        
+        # Extract tables
+        tables = self.extract_tables_from_html(soup, url)
+        
+        # Extract metadata
+        metadata_tags = self._find_metadata_tags(soup)
+        page_title = self._extract_page_title(soup, metadata_tags)
+        description = self._get_meta_description(soup, metadata_tags)
+        
+        if main_content is None:
+            # Remove unwanted elements. This mutates the soup, so it comes after
+            # the tables and metadata have been read from the full page.
+            for elem in soup.find_all(['script', 'style', 'nav', 'footer', 'header']):
+                elem.decompose()
             
+            # Extract main content
+            main = soup.find('main') or soup.find('article') or soup.find('body')
+            if main:
+                main_content = main.get_text(separator='\n', strip=True)
+            else:
+                main_content = soup.get_text(separator='\n', strip=True)
+        
+        # Clean main content
+        cleaned_content = self._clean_content(main_content or "")
+        
+        metadata = {
+            'url': url,
+            'title': page_title,
+            'description': description,
+            'num_tables': len(tables),
+            'content_length': len(cleaned_content)
+        }
+        
+        return {
+            'main_content': cleaned_content,
+            'tables': tables,
+            'metadata': metadata
+        }
+    
+    async def scrape_page_async(self, session: "aiohttp.ClientSession", url: str) -> Optional[Dict[str, Any]]:
+        """
+        Async version of scrape_page: fetches with aiohttp and parses in a worker thread
+        so parsing one page doesn't hold up downloads of the others.
+        """
+        loop = asyncio.get_running_loop()
+        if self.firecrawl:
+            # Firecrawl's client is synchronous
+            return await loop.run_in_executor(None, self.scrape_page, url)
+        
+        try:
+            async with session.get(url, headers=REQUEST_HEADERS) as response:
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type', '')
+                if not self._is_html(content_type):
+                    print(f"Skipping {url}: not an HTML page ({content_type})")
+                    return None
+                html_content = await response.text()
+            return await loop.run_in_executor(None, self._build_page_data, url, html_content, None)
         except Exception as e:
             print(f"Error scraping {url}: {e}")
             return None
     
+    async def _run_many(self, urls: List[str], concurrency: int, worker) -> List[Any]:
+        """
+        Run `worker(session, url)` for every URL over one aiohttp session, at most
+        `concurrency` at a time. Results are in the same order as `urls`.
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("aiohttp is required for async scraping (pip install aiohttp)")
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def run(session, url):
+            async with semaphore:
+                return await worker(session, url)
+        
+        timeout = aiohttp.ClientTimeout(sock_connect=REQUEST_TIMEOUT[0], sock_read=REQUEST_TIMEOUT[1])
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            return await asyncio.gather(*(run(session, url) for url in urls))
+    
+    async def scrape_many(self, urls: List[str], concurrency: int = 50) -> List[Optional[Dict[str, Any]]]:
+        """
+        Scrape many URLs concurrently. Results are in the same order as `urls`
+        (None for failures).
+        """
+        return await self._run_many(urls, concurrency, self.scrape_page_async)
+    
+    async def save_many_async(self, urls: List[str], output_dir: str = "graphrag_input",
+                              concurrency: int = 50) -> List[Optional[str]]:
+        """
+        Async version of save_many_for_graphrag. Building the content and writing
+        the files happen in a worker thread so disk I/O doesn't stall the event loop.
+        """
+        Path(output_dir).mkdir(exist_ok=True)
+        loop = asyncio.get_running_loop()
+        
+        async def save(session, url):
+            scraped_data = await self.scrape_page_async(session, url)
+            if not scraped_data:
+                return None
+            return await loop.run_in_executor(None, self._save_scraped, url, scraped_data, output_dir)
+        
+        return await self._run_many(urls, concurrency, save)
+    
     def _clean_content(self, content: str) -> str:
         """Clean content while preserving structure."""
         if not content:
             return ""
         
-        # Remove cookie notices and analytics content
-        cleaned = re.sub(r'(?i)### Cookies used by Google Analytics.*?Close\s*', '', content, flags=re.DOTALL)
-        cleaned = re.sub(r'(?i)## Cookies on.*?Manage my preferences\s*', '', cleaned, flags=re.DOTALL)
-        cleaned = re.sub(r'(?i)(accept all cookies|manage cookies|cookie preferences).*?\n', '', cleaned)
-        cleaned = re.sub(r'(?i)(skip to main content|skip navigation).*?\n', '', cleaned)
-        cleaned = re.sub(r'(?i)Allow analytics cookies.*?Close\s*', '', cleaned, flags=re.DOTALL)
-        
-        # Remove social sharing buttons at the end
-        cleaned = re.sub(r'\[Share to Facebook\].*?\[Print This Page\].*?\n', '', cleaned, flags=re.DOTALL)
-        cleaned = re.sub(r'\[Back to top\].*?\n', '', cleaned)
+        # Remove cookie notices, navigation links and social sharing buttons
+        cleaned = _DROP_RE.sub('', content)
         
         # Remove "Related documents" numerical scores (only at end of lines)
-        cleaned = re.sub(r'\n\d+\.\d+\s*$', '', cleaned, flags=re.MULTILINE)
+        cleaned = _SCORE_LINE_RE.sub('', cleaned)
         
         # Remove "Manage preferences" at the end
-        cleaned = re.sub(r'## Manage\s*\nManage preferences\s*$', '', cleaned, flags=re.DOTALL)
+        cleaned = _MANAGE_PREFS_RE.sub('', cleaned)
         
         # Clean up formatting issues
-        cleaned = re.sub(r'\[\s*\n#', '# ', cleaned)  # Fix broken headings
-        cleaned = re.sub(r'\n\s*\n\s*\n', '\n\n', cleaned)  # Multiple line breaks
-        cleaned = re.sub(r'[ \t]+', ' ', cleaned)  # Multiple spaces
+        cleaned = _BROKEN_HEADING_RE.sub('# ', cleaned)  # Fix broken headings
+        cleaned = _BLANK_LINES_RE.sub('\n\n', cleaned)  # Multiple line breaks
+        cleaned = _SPACES_RE.sub(' ', cleaned.replace('\t', ' '))  # Multiple spaces
         
         return cleaned.strip()
     
-    def _get_meta_description(self, soup) -> str:
+    def _get_meta_description(self, soup, tags: Optional[Dict[str, Any]] = None) -> str:
         """Extract meta description from HTML."""
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
+        if tags is None:
+            tags = self._find_metadata_tags(soup)
+        meta_desc = tags.get('description')
         if meta_desc:
             return meta_desc.get('content', '')
         return ''
@@ -367,10 +667,12 @@ class StructuredWebScraper:
                 
                 # Method 2: Include formatted table for structure
                 content_parts.append("**Formatted Table:**")
-                if not df.empty and df.shape[0] <= 20:  # Only include if not too large
-                    # Convert to markdown table
-                    table_md = df.to_markdown(index=False)
+                if not df.empty and df.shape[0] <= MARKDOWN_MAX_ROWS:  # Only include if not too large
+                    # Convert to markdown table, dropping columns past the width cap
+                    table_md = df.iloc[:, :MARKDOWN_MAX_COLS].to_markdown(index=False)
                     content_parts.append(table_md)
+                    if df.shape[1] > MARKDOWN_MAX_COLS:
+                        content_parts.append(f"({df.shape[1] - MARKDOWN_MAX_COLS} more columns - see summary above)")
                 else:
                     content_parts.append(f"Large table ({df.shape[0]} rows) - see summary above")
                 content_parts.append("")
@@ -387,20 +689,21 @@ class StructuredWebScraper:
         
         descriptions = []
         
-        # Describe each row as a relationship/fact
-        for i, (idx, row) in enumerate(df.iterrows()):
-            if i >= 10:  # Limit to prevent huge chunks
-                descriptions.append(f"... and {len(df) - i} more entries")
-                break
-                
-            row_desc = []
-            for col, value in row.items():
-                if pd.notna(value) and str(value).strip():
-                    row_desc.append(f"{col} is {value}")
-            
+        # Describe each row as a relationship/fact, limited to prevent huge chunks.
+        # Plain object arrays avoid building a Series per row as iterrows() does.
+        head = df.head(10)
+        columns = head.columns.to_numpy()
+        values = head.to_numpy(dtype=object)
+        present = pd.notna(values)
+        for i, (row, row_present) in enumerate(zip(values, present)):
+            row_desc = [f"{col} is {value}" for col, value, ok in zip(columns, row, row_present)
+                        if ok and str(value).strip()]
             if row_desc:
                 descriptions.append(f"Entry {i + 1}: {', '.join(row_desc)}")
         
+        if len(df) > 10:
+            descriptions.append(f"... and {len(df) - 10} more entries")
+        
         # Add column relationships
         if len(df.columns) > 1:
             descriptions.append(f"\nThis table shows relationships between: {', '.join(df.columns)}")
@@ -418,11 +721,15 @@ class StructuredWebScraper:
         if not scraped_data:
             return None
         
+        return self._save_scraped(url, scraped_data, output_dir)
+    
+    def _save_scraped(self, url: str, scraped_data: Dict[str, Any], output_dir: str) -> str:
+        """Write a scraped page's GraphRAG document and its tables to output_dir."""
         # Create GraphRAG content
         graphrag_content = self.create_graphrag_content(scraped_data)
         
         # Save main content
-        doc_id = hashlib.md5(url.encode()).hexdigest()[:12]
+        doc_id = hashlib.blake2b(url.encode(), digest_size=6).hexdigest()  # 12 hex chars
         filename = f"{doc_id}.txt"
         filepath = Path(output_dir) / filename
         
@@ -434,27 +741,37 @@ class StructuredWebScraper:
             tables_dir = Path(output_dir) / "tables"
             tables_dir.mkdir(exist_ok=True)
             
-            for i, table_info in enumerate(scraped_data['tables']):
-                table_file = tables_dir / f"{doc_id}_table_{i}.json"
-                
-                # Save table metadata and data
-                table_data = {
-                    'url': url,
-                    'table_index': i,
-                    'summary': table_info['summary'],
-                    'context': table_info['context'],
-                    'shape': table_info['shape'],
-                    'data': table_info['dataframe'].to_dict('records') if not table_info['dataframe'].empty else []
-                }
-                
-                with open(table_file, 'w', encoding='utf-8') as f:
-                    json.dump(table_data, f, indent=2, default=str)
+            # One JSON line per table, all of a page's tables in one file
+            table_file = tables_dir / f"{doc_id}_tables.jsonl"
+            with open(table_file, 'w', encoding='utf-8') as f:
+                for i, table_info in enumerate(scraped_data['tables']):
+                    df = table_info['dataframe']
+                    
+                    # Save table metadata and data; pandas' own JSON for the cells
+                    # (NaN -> null, numpy scalars) is spliced in as the last field
+                    table_meta = json.dumps({
+                        'url': url,
+                        'table_index': i,
+                        'summary': table_info['summary'],
+                        'context': table_info['context'],
+                        'shape': list(table_info['shape']),
+                    })
+                    f.write(f'{table_meta[:-1]}, "data": {df.to_json(orient="records")}}}\n')
         
         print(f"✅ Successfully saved: {filepath}")
         print(f"📊 Content length: {len(graphrag_content)} characters")
         print(f"📋 Tables found: {len(scraped_data['tables'])}")
         
         return str(filepath)
+    
+    def save_many_for_graphrag(self, urls: List[str], output_dir: str = "graphrag_input",
+                               max_workers: int = 25) -> List[Optional[str]]:
+        """
+        Run save_for_graphrag over many URLs on a thread pool; the work is mostly
+        waiting on the network. Returns file paths in the order of `urls`.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda url: self.save_for_graphrag(url, output_dir), urls))
 
 if __name__ == "__main__":
     
@@ -0,0 +1,84 @@
+"""Checks that the on-disk HTTP cache keeps the scraper's non-HTML skip intact."""
+
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("requests_cache")
+pytest.importorskip("bs4")
+pytest.importorskip("pandas")
+
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from urllib3.response import HTTPResponse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import structured_web_scraper  # noqa: E402
+
+
+class TrackingBody(io.BytesIO):
+    """Response body that records whether anything read from it."""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.was_read = False
+
+    def read(self, *args, **kwargs):
+        self.was_read = True
+        return super().read(*args, **kwargs)
+
+
+class FakeAdapter(BaseAdapter):
+    """Answers every request with a fixed body and Content-Type, without the network."""
+
+    def __init__(self, body: bytes, content_type: str):
+        super().__init__()
+        self.body = body
+        self.content_type = content_type
+        self.body_stream = None
+
+    def send(self, request, **kwargs):
+        response = Response()
+        response.status_code = 200
+        response.headers['Content-Type'] = self.content_type
+        response.url = request.url
+        response.request = request
+        self.body_stream = TrackingBody(self.body)
+        response.raw = HTTPResponse(
+            body=self.body_stream, headers={'Content-Type': self.content_type}, status=200,
+            preload_content=False, request_url=request.url
+        )
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    monkeypatch.setattr(structured_web_scraper, "CACHE_PATH", tmp_path / "cache" / "responses.sqlite")
+    monkeypatch.delenv("FIRECRAWL_API_KEY", raising=False)
+    scraper = structured_web_scraper.StructuredWebScraper(use_cache=True)
+    yield scraper
+    scraper.session.close()
+
+
+def test_pdf_response_is_neither_read_nor_cached(scraper):
+    adapter = FakeAdapter(b"%PDF-1.7 " + b"x" * 4096, "application/pdf")
+    scraper.session.mount("https://", adapter)
+
+    assert scraper.scrape_page("https://example.com/guide.pdf") is None
+    assert not adapter.body_stream.was_read
+    assert len(scraper.session.cache.responses) == 0
+
+
+def test_html_response_is_cached(scraper):
+    html = b"<html><head><title>Cost Rental homes</title></head><body><main><p>Body</p></main></body></html>"
+    adapter = FakeAdapter(html, "text/html; charset=utf-8")
+    scraper.session.mount("https://", adapter)
+
+    page = scraper.scrape_page("https://example.com/cost-rental")
+    assert page is not None and page['metadata']['title'] == "Cost Rental homes"
+    assert len(scraper.session.cache.responses) == 1
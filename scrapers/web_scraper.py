@@ -15,27 +15,34 @@ from camel.loaders import Firecrawl
 # Initialize Firecrawl
 firecrawl = Firecrawl()
 
+# Patterns used by clean_for_graphrag, compiled once
+_COOKIE_NOTICE_RE = re.compile(r'^A notice about cookies.*?(?=Service)', re.DOTALL)
+_MANAGE_PREFS_RE = re.compile(r'Manage cookie preferences.*$', re.DOTALL)
+_MANAGE_PREFS_HEADING_RE = re.compile(r'### Manage cookie preferences.*$', re.DOTALL)
+_COOKIE_PREFS_RE = re.compile(r'Cookie preferences.*?Close\s*$', re.DOTALL)
+_BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n')
+
 def clean_for_graphrag(markdown_content):
     """Clean markdown content while preserving structure for GraphRAG"""
     # Remove cookie notice at the beginning (from start until "Service")
-    cleaned = re.sub(r'^A notice about cookies.*?(?=Service)', '', markdown_content, flags=re.DOTALL)
+    cleaned = _COOKIE_NOTICE_RE.sub('', markdown_content)
     
     # Remove cookie preferences section at the end
-    cleaned = re.sub(r'Manage cookie preferences.*$', '', cleaned, flags=re.DOTALL)
+    cleaned = _MANAGE_PREFS_RE.sub('', cleaned)
     
     # Also handle alternative ending patterns
-    cleaned = re.sub(r'### Manage cookie preferences.*$', '', cleaned, flags=re.DOTALL)
-    cleaned = re.sub(r'Cookie preferences.*?Close\s*$', '', cleaned, flags=re.DOTALL)
+    cleaned = _MANAGE_PREFS_HEADING_RE.sub('', cleaned)
+    cleaned = _COOKIE_PREFS_RE.sub('', cleaned)
     
     # Remove excessive whitespace but preserve structure
-    cleaned = re.sub(r'\n\s*\n\s*\n', '\n\n', cleaned)
+    cleaned = _BLANK_LINES_RE.sub('\n\n', cleaned)
     cleaned = cleaned.strip()
     
     return cleaned
 
 def generate_document_id(url):
     """Generate a unique document ID from URL"""
-    return hashlib.md5(url.encode()).hexdigest()[:12]
+    return hashlib.blake2b(url.encode(), digest_size=6).hexdigest()  # 12 hex chars
 
 def scrape_and_save_for_graphrag(url, output_dir="graphrag_input"):
     """